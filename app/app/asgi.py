@@ -9,8 +9,22 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+
+class AsyncReadsASGIHandler(ASGIHandler):
+    """Serve requests from app.asgi_urls, with async read endpoints"""
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = 'app.asgi_urls'
+        return request, error_response
+
+
+application = AsyncReadsASGIHandler()
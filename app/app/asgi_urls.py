@@ -0,0 +1,8 @@
+"""
+URL configuration served by app.asgi: app.urls with the recipe read
+endpoints running as async views on a bounded thread pool
+"""
+from app.urls import urlpatterns as sync_urlpatterns
+from recipe.async_views import async_read_patterns
+
+urlpatterns = async_read_patterns(sync_urlpatterns)
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'user',
     'rest_framework',
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -86,7 +88,10 @@ DATABASES = {
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
-        'PASSWORD': os.environ.get('DB_PASS')
+        'PASSWORD': os.environ.get('DB_PASS'),
+        # Seconds a connection is reused. Under ASGI, set it so the async
+        # read threads keep their connections between requests.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
     }
 }
 
@@ -142,8 +147,148 @@ AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.ORJSONParser',
+        'rest_framework.parsers.JSONParser',
+        'core.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Directory of the file based caches shared by the workers on one host.
+# Point their backends at memcached to share them between hosts.
+# app.test_runner swaps every cache for a process-local one.
+CACHE_DIR = os.environ.get('CACHE_DIR', '/vol/web/cache')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Per-user API response cache. It must be shared by all workers, so
+    # each sees the invalidations of the others.
+    'responses': {
+        'BACKEND': os.environ.get(
+            'RESPONSE_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.environ.get(
+            'RESPONSE_CACHE_LOCATION', os.path.join(CACHE_DIR, 'responses')),
+        'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 600)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+    # Users of authentication tokens, shared by all workers so deleted
+    # tokens and deactivated users are rejected by each of them
+    'auth': {
+        'BACKEND': os.environ.get(
+            'AUTH_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.environ.get(
+            'AUTH_CACHE_LOCATION', os.path.join(CACHE_DIR, 'auth')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('AUTH_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+    # Counters of the compression middleware and password hashing pool,
+    # shared so the compression_stats and password_hash_stats commands see
+    # those of every worker
+    'stats': {
+        'BACKEND': os.environ.get(
+            'STATS_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.environ.get(
+            'STATS_CACHE_LOCATION', os.path.join(CACHE_DIR, 'stats')),
+    },
+}
+
+# Seconds each process sums counters before adding them to the stats cache
+STATS_FLUSH_INTERVAL = int(os.environ.get('STATS_FLUSH_INTERVAL', 10))
+
+# Cache used by recipe.cache for list and detail responses
+RESPONSE_CACHE = 'responses'
+
+# Cache used by core.authentication.CachedTokenAuthentication and how long
+# a resolved token stays cached, in seconds
+TOKEN_AUTH_CACHE = 'auth'
+TOKEN_AUTH_CACHE_TIMEOUT = int(os.environ.get('TOKEN_AUTH_CACHE_TIMEOUT', 300))
+
+# Response compression by core.middleware.CompressionMiddleware. brotli and
+# zstd are offered besides gzip when the brotli and zstandard packages are
+# installed. Counters go to COMPRESSION_STATS_CACHE.
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_LEVEL = int(os.environ.get('COMPRESSION_BROTLI_LEVEL', 4))
+COMPRESSION_ZSTD_LEVEL = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))
+COMPRESSION_SKIP_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff',
+    'application/gzip', 'application/zip', 'application/zstd',
+)
+COMPRESSION_STATS_CACHE = 'stats'
+
+# Limits checked while an image upload streams in, before it is decoded
+IMAGE_UPLOAD_MAX_BYTES = int(
+    os.environ.get('IMAGE_UPLOAD_MAX_BYTES', 10 * 1024 * 1024))
+IMAGE_UPLOAD_MAX_PIXELS = int(
+    os.environ.get('IMAGE_UPLOAD_MAX_PIXELS', 40_000_000))
+IMAGE_UPLOAD_FORMATS = ['JPEG', 'PNG', 'WEBP']
+
+# Processes resizing uploaded recipe images; 0 processes them inline
+IMAGE_PROCESSING_WORKERS = int(os.environ.get('IMAGE_PROCESSING_WORKERS', 2))
+
+# Maximum number of recipes in one request to the bulk endpoint
+API_BULK_MAX_ITEMS = int(os.environ.get('API_BULK_MAX_ITEMS', 1000))
+
+# Cursor pagination for the list endpoints, used when a client passes
+# `cursor` or `page_size`
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 50))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 500))
+
+# Threads running the read endpoints served as async views by app.asgi.
+# Each holds its own database connection, reused up to CONN_MAX_AGE.
+ASYNC_READ_THREADS = int(os.environ.get('ASYNC_READ_THREADS', 8))
+
+# Passwords hashed or verified at once by each process for the user and
+# token endpoints; 0 for no limit. Beyond PASSWORD_HASH_QUEUE waiting
+# hashes, requests fail fast with 503 and Retry-After
+# PASSWORD_HASH_RETRY_AFTER seconds. Latency and queue depth counters go
+# to PASSWORD_HASH_STATS_CACHE.
+PASSWORD_HASH_CONCURRENCY = int(
+    os.environ.get('PASSWORD_HASH_CONCURRENCY', 2))
+PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 8))
+PASSWORD_HASH_RETRY_AFTER = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', 1))
+PASSWORD_HASH_STATS_CACHE = 'stats'
+
+# Most names returned by tag and ingredient autocomplete (`q`)
+AUTOCOMPLETE_LIMIT = int(os.environ.get('AUTOCOMPLETE_LIMIT', 10))
+# Least trigram similarity, from 0 to 1, of autocomplete names that do not
+# start with `q`
+AUTOCOMPLETE_MIN_SIMILARITY = float(
+    os.environ.get('AUTOCOMPLETE_MIN_SIMILARITY', 0.3))
+
+# Version of the deployed code, such as a commit hash. The cached OpenAPI
+# schema is rebuilt when it changes; when empty, a hash of the sources is
+# used instead.
+CODE_VERSION = os.environ.get('CODE_VERSION', '')
+
+# Directory of the rendered OpenAPI schema files, written on first request
+# or by the cache_schema command. Files found here are served as they are,
+# so it must only be writable by the app.
+SCHEMA_CACHE_DIR = os.environ.get('SCHEMA_CACHE_DIR', '/vol/web/schema')
+
+# Runs the tests with process-local caches
+TEST_RUNNER = 'app.test_runner.TestRunner'
+
 SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True, 
 }
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""
+Test runner for the project
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Run the tests with every cache replaced by a process-local one, so a
+    run neither reads entries left by earlier runs nor needs the shared
+    caches of a deployment
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.local_caches = override_settings(CACHES={
+            alias: dict(config, BACKEND=LOCAL_CACHE_BACKEND, LOCATION=alias)
+            for alias, config in settings.CACHES.items()
+        })
+        self.local_caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.local_caches.disable()
+        super().teardown_test_environment(**kwargs)
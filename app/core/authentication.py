@@ -0,0 +1,82 @@
+"""
+Authentication classes
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def token_cache():
+    return caches[settings.TOKEN_AUTH_CACHE]
+
+
+def token_cache_key(key):
+    # Keep bearer tokens out of the cache, which may be shared
+    return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_tokens(keys):
+    """Drop cached users for the given token keys"""
+    token_cache().delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches the id and is_active flag of the
+    token's user, so repeated requests with the same token skip the
+    database lookup. The user is then given with only those fields
+    loaded; others load when first read.
+
+    Entries are dropped when the token is deleted or its user is saved,
+    and expire after TOKEN_AUTH_CACHE_TIMEOUT seconds for changes made
+    without signals, such as queryset updates. TOKEN_AUTH_CACHE must be
+    shared by all workers for the drops to reach each of them.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = token_cache()
+        cache_key = token_cache_key(key)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            user_id, is_active = cached
+            if is_active:
+                return self._cached_credentials(key, user_id, is_active)
+
+        user, token = super().authenticate_credentials(key)
+        cache.set(cache_key, (user.pk, user.is_active),
+                  settings.TOKEN_AUTH_CACHE_TIMEOUT)
+
+        return (user, token)
+
+    def _cached_credentials(self, key, user_id, is_active):
+        user_model = get_user_model()
+        user = user_model.from_db(user_model.objects.db,
+                                  ['id', 'is_active'], [user_id, is_active])
+        token = Token.from_db(Token.objects.db, ['key', 'user_id'],
+                              [key, user_id])
+        token.user = user
+
+        return (user, token)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_tokens([instance.key])
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Drop cached tokens so password and is_active changes apply"""
+    if created:
+        return
+
+    invalidate_tokens(
+        Token.objects.filter(user=instance).values_list('key', flat=True)
+    )
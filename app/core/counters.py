@@ -0,0 +1,54 @@
+"""
+Counters kept in a Django cache
+"""
+import atexit
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+
+def increment(cache, key, delta=1):
+    """Add `delta` to the counter `key` in `cache`, starting it at 0"""
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Missing, or evicted; another process may add it first
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+class BufferedCounters:
+    """
+    Counters summed in this process and added to the cache returned by
+    `get_cache` at most every STATS_FLUSH_INTERVAL seconds, so recording
+    them costs no cache round trip. Counts not yet flushed are added when
+    the process exits.
+    """
+
+    def __init__(self, get_cache):
+        self.get_cache = get_cache
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._flushed = time.monotonic()
+        atexit.register(self.flush)
+
+    def add(self, counts):
+        """Add the {key: delta} `counts`, flushing all if it is time to"""
+        with self._lock:
+            self._counts.update(counts)
+            due = (time.monotonic() - self._flushed >=
+                   settings.STATS_FLUSH_INTERVAL)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Add the counts recorded so far to the cache"""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._flushed = time.monotonic()
+        if counts:
+            cache = self.get_cache()
+            for key, delta in counts.items():
+                increment(cache, key, delta)
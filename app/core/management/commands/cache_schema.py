@@ -0,0 +1,37 @@
+"""
+Django command to render the OpenAPI schema cache.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.schema import (
+    RENDERERS,
+    code_version,
+    generate_schema,
+    remove_stale_schema_files,
+    schema_path,
+    write_schema_file,
+)
+
+
+class Command(BaseCommand):
+    """Django command to render the OpenAPI schema cache."""
+    help = (
+        'Generate the OpenAPI schema and write it in each format to '
+        'SCHEMA_CACHE_DIR for the current code version, so /api/schema/ '
+        'serves it without generating it. Files of other versions are '
+        'removed.'
+    )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        version = code_version()
+        schema = generate_schema()
+        for renderer_class in RENDERERS:
+            renderer = renderer_class()
+            path = schema_path(version, renderer)
+            content = renderer.render(schema, renderer.media_type, {})
+            if not write_schema_file(path, content):
+                raise CommandError(f'Cannot write {path}')
+            self.stdout.write(f'Wrote {path}')
+
+        remove_stale_schema_files(version)
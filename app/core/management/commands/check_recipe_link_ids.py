@@ -0,0 +1,69 @@
+"""
+Django command to check the tag and ingredient id arrays of recipes.
+"""
+from django.contrib.postgres.fields import ArrayField
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import BigIntegerField, F, OuterRef, Subquery
+
+from core.management.commands.sync_recipe_link_ids import sync_link_ids
+from core.models import Recipe
+
+# Stale recipe ids listed in the report
+SHOWN_IDS = 20
+
+
+class ArraySubquery(Subquery):
+    """Collect a single column subquery into an array"""
+    template = 'ARRAY(%(subquery)s)'
+    output_field = ArrayField(BigIntegerField())
+
+
+def linked_ids(through, field):
+    return ArraySubquery(
+        through.objects.filter(recipe_id=OuterRef('pk')).order_by(
+            field).values(field)
+    )
+
+
+def stale_recipe_ids():
+    """Return ids of recipes whose arrays differ from the through tables"""
+    return Recipe.objects.alias(
+        expected_tag_ids=linked_ids(Recipe.tags.through, 'tag_id'),
+        expected_ingredient_ids=linked_ids(
+            Recipe.ingredients.through, 'ingredient_id'),
+    ).exclude(
+        tag_ids=F('expected_tag_ids'),
+        ingredient_ids=F('expected_ingredient_ids'),
+    ).order_by('id').values_list('id', flat=True)
+
+
+class Command(BaseCommand):
+    """Django command to check Recipe.tag_ids and ingredient_ids."""
+    help = (
+        'Compare the tag and ingredient id arrays of recipes with the m2m '
+        'tables. Exits with an error if any differ, unless --fix is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Recompute the arrays of the recipes that differ.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        stale = list(stale_recipe_ids())
+        if not stale:
+            self.stdout.write(self.style.SUCCESS('All recipes in sync.'))
+            return
+
+        shown = ', '.join(str(i) for i in stale[:SHOWN_IDS])
+        if len(stale) > SHOWN_IDS:
+            shown += ', ...'
+        message = f'{len(stale)} recipes out of sync: {shown}'
+        if not options['fix']:
+            raise CommandError(message)
+
+        self.stdout.write(message)
+        sync_link_ids(stale)
+        self.stdout.write(self.style.SUCCESS(f'Synced {len(stale)} recipes.'))
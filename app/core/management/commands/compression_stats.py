@@ -0,0 +1,22 @@
+"""
+Django command to show the response compression counters.
+"""
+from django.core.management.base import BaseCommand
+
+from core.middleware import compression_stats
+
+
+class Command(BaseCommand):
+    """Django command to show response compression counters."""
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        for encoding, stats in compression_stats().items():
+            responses = stats['responses']
+            ratio = stats['bytes_in'] / stats['bytes_out'] if responses else 0
+            cpu_ms = stats['cpu_us'] / 1000 / responses if responses else 0
+            self.stdout.write(
+                f'{encoding}: {responses} responses, '
+                f'{stats["bytes_in"]} -> {stats["bytes_out"]} bytes, '
+                f'ratio {ratio:.2f}, {cpu_ms:.2f} ms CPU per response'
+            )
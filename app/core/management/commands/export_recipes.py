@@ -0,0 +1,109 @@
+"""
+Django command to export recipes as NDJSON.
+"""
+import json
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from core.models import Recipe
+
+
+def related_names(through, field, recipe_ids):
+    """Return {recipe id: [names]} of a recipe m2m relation"""
+    names = {}
+    rows = through.objects.filter(recipe_id__in=recipe_ids).values_list(
+        'recipe_id', f'{field}__name')
+    for recipe_id, name in rows:
+        names.setdefault(recipe_id, []).append(name)
+
+    return names
+
+
+class Command(BaseCommand):
+    """Django command to export recipes as NDJSON."""
+    help = (
+        'Write recipes, one JSON object per line, ordered by id. Images '
+        'are not exported.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', dest='usernames', default=[],
+            help='Only export recipes of this username (repeatable).',
+        )
+        parser.add_argument(
+            '--output', default='-',
+            help='File to write to, or - for stdout (default). Appended to '
+                 'when resuming with --after-id.',
+        )
+        parser.add_argument(
+            '--after-id', type=int, default=0,
+            help='Resume after the recipe with this id.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument(
+            '--progress-every', type=int, default=10000,
+            help='Report progress every this many recipes.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        queryset = Recipe.objects.filter(
+            id__gt=options['after_id']).order_by('id')
+        if options['usernames']:
+            queryset = queryset.filter(
+                user__username__in=options['usernames'])
+        rows = queryset.values(
+            'id', 'user__username', 'title', 'description', 'time_minutes',
+            'price', 'link',
+        ).iterator(chunk_size=options['chunk_size'])
+
+        if options['output'] == '-':
+            self._export(rows, self.stdout, options)
+        else:
+            mode = 'a' if options['after_id'] else 'w'
+            with open(options['output'], mode, encoding='utf-8') as out:
+                self._export(rows, out, options)
+
+    def _export(self, rows, out, options):
+        started = time.monotonic()
+        count = 0
+        last_id = options['after_id']
+        while True:
+            chunk = list(islice(rows, options['chunk_size']))
+            if not chunk:
+                break
+
+            recipe_ids = [row['id'] for row in chunk]
+            tags = related_names(Recipe.tags.through, 'tag', recipe_ids)
+            ingredients = related_names(
+                Recipe.ingredients.through, 'ingredient', recipe_ids)
+            for row in chunk:
+                record = {
+                    'id': row['id'],
+                    'user': row['user__username'],
+                    'title': row['title'],
+                    'description': row['description'],
+                    'time_minutes': row['time_minutes'],
+                    'price': str(row['price']),
+                    'link': row['link'],
+                    'tags': tags.get(row['id'], []),
+                    'ingredients': ingredients.get(row['id'], []),
+                }
+                out.write(json.dumps(record) + '\n')
+                count += 1
+                last_id = row['id']
+                if count % options['progress_every'] == 0:
+                    self._report(count, last_id, started)
+
+        out.flush()
+        self._report(count, last_id, started)
+
+    def _report(self, count, last_id, started):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stderr.write(
+            f'Exported {count} recipes ({count / elapsed:.0f}/s), '
+            f'last id {last_id}. Resume with --after-id {last_id}.'
+        )
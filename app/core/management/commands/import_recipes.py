@@ -0,0 +1,215 @@
+"""
+Django command to import recipes from NDJSON.
+"""
+import json
+import sys
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.cache import invalidate_user
+
+# Recipe fields read from each line, and whether they are required
+RECIPE_FIELDS = {
+    'title': True,
+    'time_minutes': True,
+    'price': True,
+    'description': False,
+    'link': False,
+}
+
+NAMED_FIELDS = {'tags': Tag, 'ingredients': Ingredient}
+
+
+def clean_field(field, value, name):
+    try:
+        return field.clean(value, None)
+    except ValidationError as exc:
+        raise ValueError(f'invalid {name!r}: {" ".join(exc.messages)}')
+
+
+def clean_record(record):
+    """
+    Return the user, Recipe field values and tag and ingredient names of
+    an exported line. Raises ValueError for missing or invalid values.
+    """
+    if not isinstance(record, dict):
+        raise ValueError('expected a JSON object')
+    if not isinstance(record.get('user'), str):
+        raise ValueError("missing or invalid 'user'")
+
+    cleaned = {'user': record['user']}
+    for name, required in RECIPE_FIELDS.items():
+        if name in record:
+            cleaned[name] = clean_field(
+                Recipe._meta.get_field(name), record[name], name)
+        elif required:
+            raise ValueError(f'missing {name!r}')
+
+    for name, model in NAMED_FIELDS.items():
+        names = record.get(name, [])
+        if not isinstance(names, list):
+            raise ValueError(f'invalid {name!r}: expected a list')
+        field = model._meta.get_field('name')
+        cleaned[name] = [clean_field(field, value, name) for value in names]
+
+    return cleaned
+
+
+def get_or_create_named(model, user_names):
+    """
+    Return {(user id, name): id} for the given pairs, inserting the
+    missing ones in bulk
+    """
+    ids = {}
+    for user_id in {user_id for user_id, _ in user_names}:
+        names = {name for owner, name in user_names if owner == user_id}
+        existing = dict(model.objects.filter(
+            user_id=user_id, name__in=names).values_list('name', 'id'))
+        missing = names - existing.keys()
+        if missing:
+            model.objects.bulk_create(
+                [model(user_id=user_id, name=name) for name in missing],
+                ignore_conflicts=True,
+            )
+            existing.update(model.objects.filter(
+                user_id=user_id, name__in=missing).values_list('name', 'id'))
+        ids.update({(user_id, name): id for name, id in existing.items()})
+
+    return ids
+
+
+class Command(BaseCommand):
+    """Django command to import recipes from NDJSON."""
+    help = (
+        'Create recipes from lines written by export_recipes. Owners are '
+        'matched by username and must exist.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input', nargs='?', default='-',
+            help='File to read, or - for stdin (default).',
+        )
+        parser.add_argument(
+            '--user', action='append', dest='usernames', default=[],
+            help='Only import recipes of this username (repeatable).',
+        )
+        parser.add_argument(
+            '--offset', type=int, default=0,
+            help='Skip this many lines, to resume an interrupted import.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--progress-every', type=int, default=10000,
+            help='Report progress every this many lines.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        self.user_ids = {}
+        self.touched_users = set()
+        if options['input'] == '-':
+            self._import(sys.stdin, options)
+        else:
+            with open(options['input'], encoding='utf-8') as lines:
+                self._import(lines, options)
+
+        for user_id in self.touched_users:
+            invalidate_user(user_id)
+
+    def _import(self, lines, options):
+        started = time.monotonic()
+        line_number = options['offset']
+        lines = islice(lines, options['offset'], None)
+        imported = 0
+        next_report = line_number + options['progress_every']
+        while True:
+            batch = list(islice(lines, options['batch_size']))
+            if not batch:
+                break
+
+            # Batches before this one are committed
+            self.resume_offset = line_number
+            records = []
+            for i, line in enumerate(batch, start=line_number + 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = clean_record(json.loads(line))
+                except ValueError as exc:
+                    self._fail(i, exc)
+                if (not options['usernames'] or
+                        record['user'] in options['usernames']):
+                    records.append((i, record))
+
+            imported += self._import_batch(records)
+            line_number += len(batch)
+            if line_number >= next_report:
+                self._report(line_number, imported, started)
+                next_report = line_number + options['progress_every']
+
+        self._report(line_number, imported, started)
+
+    def _get_user_id(self, line_number, username):
+        if username not in self.user_ids:
+            user_id = get_user_model().objects.filter(
+                username=username).values_list('id', flat=True).first()
+            if user_id is None:
+                self._fail(line_number, f'unknown user {username!r}')
+            self.user_ids[username] = user_id
+
+        return self.user_ids[username]
+
+    def _fail(self, line_number, error):
+        raise CommandError(
+            f'Line {line_number}: {error}. Lines before '
+            f'{self.resume_offset + 1} are imported; resume with --offset '
+            f'{self.resume_offset}.'
+        )
+
+    def _import_batch(self, records):
+        """Create one batch of recipes and their links in a transaction"""
+        recipes = []
+        for line_number, record in records:
+            user_id = self._get_user_id(line_number, record['user'])
+            recipes.append(Recipe(user_id=user_id, **{
+                name: record[name] for name in RECIPE_FIELDS if name in record
+            }))
+        if not recipes:
+            return 0
+
+        with transaction.atomic():
+            Recipe.objects.bulk_create(recipes)
+
+            for field, model in NAMED_FIELDS.items():
+                pairs = {
+                    (recipe.user_id, name)
+                    for recipe, (_, record) in zip(recipes, records)
+                    for name in record[field]
+                }
+                ids = get_or_create_named(model, pairs)
+                through = getattr(Recipe, field).through
+                column = f'{model._meta.model_name}_id'
+                through.objects.bulk_create([
+                    through(recipe_id=recipe.pk,
+                            **{column: ids[(recipe.user_id, name)]})
+                    for recipe, (_, record) in zip(recipes, records)
+                    for name in set(record[field])
+                ])
+
+        self.touched_users.update(recipe.user_id for recipe in recipes)
+        return len(recipes)
+
+    def _report(self, line_number, imported, started):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stderr.write(
+            f'Imported {imported} recipes ({imported / elapsed:.0f}/s) '
+            f'through line {line_number}. Resume with --offset '
+            f'{line_number}.'
+        )
@@ -0,0 +1,23 @@
+"""
+Django command to show the password hashing counters.
+"""
+from django.core.management.base import BaseCommand
+
+from core.passwords import password_hash_stats
+
+
+class Command(BaseCommand):
+    """Django command to show password hashing counters."""
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        stats = password_hash_stats()
+        hashes = stats['hashes']
+        wait_ms = stats['wait_us'] / 1000 / hashes if hashes else 0
+        hash_ms = stats['hash_us'] / 1000 / hashes if hashes else 0
+        depth = stats['queue_depth'] / hashes if hashes else 0
+        self.stdout.write(
+            f'{hashes} hashes, {stats["rejected"]} rejected, '
+            f'{wait_ms:.2f} ms queued and {hash_ms:.2f} ms hashing per hash, '
+            f'{depth:.2f} hashes ahead on average'
+        )
@@ -0,0 +1,48 @@
+"""
+Django command to recompute the tag and ingredient id arrays of recipes.
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import Recipe
+
+
+def sync_link_ids(recipe_ids):
+    """
+    Recompute tag_ids and ingredient_ids of the given recipes. Naming
+    either column in an update makes the database trigger fill both in
+    from the through tables.
+    """
+    return Recipe.objects.filter(id__in=recipe_ids).update(tag_ids=[])
+
+
+class Command(BaseCommand):
+    """Django command to backfill Recipe.tag_ids and ingredient_ids."""
+    help = (
+        'Recompute the tag and ingredient id arrays of every recipe from '
+        'the m2m tables, in chunks ordered by id.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument(
+            '--after-id', type=int, default=0,
+            help='Resume after the recipe with this id.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        last_id = options['after_id']
+        count = 0
+        while True:
+            recipe_ids = list(Recipe.objects.filter(
+                id__gt=last_id,
+            ).order_by('id').values_list('id', flat=True)[
+                :options['chunk_size']])
+            if not recipe_ids:
+                break
+
+            count += sync_link_ids(recipe_ids)
+            last_id = recipe_ids[-1]
+            self.stderr.write(f'Synced {count} recipes, last id {last_id}.')
+
+        self.stdout.write(self.style.SUCCESS(f'Synced {count} recipes.'))
@@ -0,0 +1,212 @@
+"""
+Response compression for the API
+"""
+import time
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.regex_helper import _lazy_re_compile
+
+from core.counters import BufferedCounters
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+STATS_FIELDS = ('responses', 'bytes_in', 'bytes_out', 'cpu_us')
+
+re_accepts_encoding = _lazy_re_compile(
+    r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def _gzip():
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL,
+                                  zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return (compressor.compress,
+            lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush)
+
+
+def _brotli():
+    compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_LEVEL)
+    return compressor.process, compressor.flush, compressor.finish
+
+
+def _zstd():
+    compressor = zstandard.ZstdCompressor(
+        level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+    return (compressor.compress,
+            lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush)
+
+
+def available_encodings():
+    """
+    Return {encoding: compressor factory} in order of preference. Each
+    factory returns (compress, flush, finish) callables.
+    """
+    encodings = {}
+    if brotli is not None:
+        encodings['br'] = _brotli
+    if zstandard is not None:
+        encodings['zstd'] = _zstd
+    encodings['gzip'] = _gzip
+
+    return encodings
+
+
+def choose_encoding(accept_encoding, encodings):
+    """
+    Return the encoding from `encodings` with the highest quality in the
+    Accept-Encoding header `accept_encoding`, or None. Ties go to the
+    earlier encoding.
+    """
+    qualities = {}
+    for item in accept_encoding.split(','):
+        match = re_accepts_encoding.match(item)
+        if not match:
+            continue
+        try:
+            quality = float(match[2]) if match[2] else 1.0
+        except ValueError:
+            continue
+        qualities[match[1].lower()] = quality
+
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get('*', 0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    return best
+
+
+def stats_cache():
+    return caches[settings.COMPRESSION_STATS_CACHE]
+
+
+def stats_key(encoding, field):
+    return f'compression:{encoding}:{field}'
+
+
+counters = BufferedCounters(stats_cache)
+
+
+def record_stats(encoding, bytes_in, bytes_out, cpu_seconds):
+    """Add one compressed response to the counters of `encoding`"""
+    values = (1, bytes_in, bytes_out, round(cpu_seconds * 1e6))
+    counters.add({
+        stats_key(encoding, field): value
+        for field, value in zip(STATS_FIELDS, values)
+    })
+
+
+def compression_stats():
+    """Return {encoding: counters} of the compressed responses so far"""
+    counters.flush()
+    encodings = available_encodings()
+    keys = [stats_key(encoding, field)
+            for encoding in encodings for field in STATS_FIELDS]
+    counts = stats_cache().get_many(keys)
+
+    return {
+        encoding: {
+            field: counts.get(stats_key(encoding, field), 0)
+            for field in STATS_FIELDS
+        }
+        for encoding in encodings
+    }
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with brotli, zstd or gzip, as negotiated by
+    Accept-Encoding. brotli and zstd are used when their packages are
+    installed.
+
+    Responses under COMPRESSION_MIN_SIZE bytes, media files and content
+    types listed in COMPRESSION_SKIP_TYPES are sent as they are. Streamed
+    responses are compressed chunk by chunk. The CPU time spent is sent in
+    a Server-Timing header and added, with the sizes, to counters read by
+    the compression_stats command.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.encodings = available_encodings()
+
+    def process_response(self, request, response):
+        if not self._compressible(request, response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), self.encodings)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self._compress_stream(
+                encoding, response.streaming_content)
+            del response['Content-Length']
+        else:
+            started = time.thread_time()
+            compress, _, finish = self.encodings[encoding]()
+            content = compress(response.content) + finish()
+            cpu_seconds = time.thread_time() - started
+            if len(content) >= len(response.content):
+                return response
+
+            record_stats(encoding, len(response.content), len(content),
+                         cpu_seconds)
+            response.content = content
+            response['Content-Length'] = str(len(content))
+            response['Server-Timing'] = (
+                f'compress;desc="{encoding}";dur={cpu_seconds * 1000:.2f}')
+
+        # The compressed body is not byte for byte the one the ETag named
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+
+        return response
+
+    def _compressible(self, request, response):
+        if (response.has_header('Content-Encoding') or
+                request.path.startswith(settings.MEDIA_URL)):
+            return False
+
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if content_type.startswith(settings.COMPRESSION_SKIP_TYPES):
+            return False
+
+        return response.streaming or (
+            len(response.content) >= settings.COMPRESSION_MIN_SIZE)
+
+    def _compress_stream(self, encoding, chunks):
+        """Compress `chunks`, flushing after each so none is held back"""
+        compress, flush, finish = self.encodings[encoding]()
+        bytes_in = bytes_out = cpu_seconds = 0
+        for chunk in chunks:
+            started = time.thread_time()
+            data = compress(chunk) + flush()
+            cpu_seconds += time.thread_time() - started
+            bytes_in += len(chunk)
+            bytes_out += len(data)
+            if data:
+                yield data
+
+        data = finish()
+        bytes_out += len(data)
+        record_stats(encoding, bytes_in, bytes_out, cpu_seconds)
+        yield data
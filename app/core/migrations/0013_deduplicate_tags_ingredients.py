@@ -0,0 +1,55 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:29
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicates(model, relation):
+    """
+    Keep the oldest row for each (user, name), move recipe links from
+    the duplicates onto it and delete the duplicates
+    """
+    through = relation.through
+    target_field = f'{relation.field.m2m_reverse_field_name()}_id'
+    groups = (
+        model.objects.values('user', 'name')
+        .annotate(keep_id=Min('id'), rows=Count('id'))
+        .filter(rows__gt=1)
+    )
+    for group in groups:
+        duplicate_ids = list(
+            model.objects.filter(user=group['user'], name=group['name'])
+            .exclude(id=group['keep_id'])
+            .values_list('id', flat=True)
+        )
+        linked = set(
+            through.objects.filter(**{target_field: group['keep_id']})
+            .values_list('recipe_id', flat=True)
+        )
+        moved = set(
+            through.objects.filter(**{f'{target_field}__in': duplicate_ids})
+            .exclude(recipe_id__in=linked)
+            .values_list('recipe_id', flat=True)
+        )
+        through.objects.bulk_create([
+            through(recipe_id=recipe_id, **{target_field: group['keep_id']})
+            for recipe_id in moved
+        ])
+        model.objects.filter(id__in=duplicate_ids).delete()
+
+
+def deduplicate(apps, schema_editor):
+    Recipe = apps.get_model('core', 'Recipe')
+    merge_duplicates(apps.get_model('core', 'Tag'), Recipe.tags)
+    merge_duplicates(apps.get_model('core', 'Ingredient'), Recipe.ingredients)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_recipe_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate, migrations.RunPython.noop),
+    ]
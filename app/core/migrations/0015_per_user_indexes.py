@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_unique_tag_ingredient_names'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', '-id'], name='core_recipe_user_id_desc_idx'),
+        ),
+        # The auto-created through tables only index (recipe_id, tag_id);
+        # these serve lookups that start from the tag or ingredient side.
+        migrations.RunSQL(
+            'CREATE INDEX core_recipe_tags_tag_recipe_idx '
+            'ON core_recipe_tags (tag_id, recipe_id)',
+            'DROP INDEX core_recipe_tags_tag_recipe_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX core_recipe_ingr_ingr_recipe_idx '
+            'ON core_recipe_ingredients (ingredient_id, recipe_id)',
+            'DROP INDEX core_recipe_ingr_ingr_recipe_idx',
+        ),
+    ]
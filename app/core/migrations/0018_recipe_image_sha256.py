@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_sha256',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:02
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}description, '')), 'B')"
+)
+
+CREATE_SEARCH = f"""
+CREATE FUNCTION core_recipe_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR.format(row='NEW.')};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_recipe_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON core_recipe
+    FOR EACH ROW EXECUTE FUNCTION core_recipe_search_vector_update();
+
+UPDATE core_recipe SET search_vector = {SEARCH_VECTOR.format(row='')};
+
+CREATE INDEX core_recipe_search_vector_idx
+    ON core_recipe USING gin (search_vector);
+"""
+
+DROP_SEARCH = """
+DROP INDEX core_recipe_search_vector_idx;
+DROP TRIGGER core_recipe_search_vector_trigger ON core_recipe;
+DROP FUNCTION core_recipe_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_recipe_image_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # Bulk inserts and queryset updates bypass model signals, so the
+        # vector is maintained in the database
+        migrations.RunSQL(CREATE_SEARCH, DROP_SEARCH),
+    ]
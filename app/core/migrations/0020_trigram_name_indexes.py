@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:20
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# UPPER(name) matches the expression istartswith lookups compare, and
+# trigram matching ignores case anyway
+CREATE_INDEXES = """
+CREATE INDEX core_tag_name_trgm_idx
+    ON core_tag USING gin (UPPER(name) gin_trgm_ops);
+CREATE INDEX core_ingredient_name_trgm_idx
+    ON core_ingredient USING gin (UPPER(name) gin_trgm_ops);
+"""
+
+DROP_INDEXES = """
+DROP INDEX core_tag_name_trgm_idx;
+DROP INDEX core_ingredient_name_trgm_idx;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_recipe_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(CREATE_INDEXES, DROP_INDEXES),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:58
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+# Any update naming tag_ids or ingredient_ids recomputes both from the
+# through tables, which also corrects stale values saved by the ORM
+CREATE_TRIGGERS = """
+CREATE FUNCTION core_recipe_link_ids_update() RETURNS trigger AS $$
+BEGIN
+    NEW.tag_ids := ARRAY(
+        SELECT tag_id FROM core_recipe_tags
+        WHERE recipe_id = NEW.id ORDER BY tag_id);
+    NEW.ingredient_ids := ARRAY(
+        SELECT ingredient_id FROM core_recipe_ingredients
+        WHERE recipe_id = NEW.id ORDER BY ingredient_id);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_recipe_link_ids_trigger
+    BEFORE UPDATE OF tag_ids, ingredient_ids ON core_recipe
+    FOR EACH ROW EXECUTE FUNCTION core_recipe_link_ids_update();
+
+CREATE FUNCTION core_recipe_links_changed() RETURNS trigger AS $$
+BEGIN
+    UPDATE core_recipe SET tag_ids = '{}'
+    WHERE id IN (SELECT recipe_id FROM changed_links);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_recipe_tags_insert_trigger
+    AFTER INSERT ON core_recipe_tags
+    REFERENCING NEW TABLE AS changed_links
+    FOR EACH STATEMENT EXECUTE FUNCTION core_recipe_links_changed();
+CREATE TRIGGER core_recipe_tags_delete_trigger
+    AFTER DELETE ON core_recipe_tags
+    REFERENCING OLD TABLE AS changed_links
+    FOR EACH STATEMENT EXECUTE FUNCTION core_recipe_links_changed();
+CREATE TRIGGER core_recipe_ingredients_insert_trigger
+    AFTER INSERT ON core_recipe_ingredients
+    REFERENCING NEW TABLE AS changed_links
+    FOR EACH STATEMENT EXECUTE FUNCTION core_recipe_links_changed();
+CREATE TRIGGER core_recipe_ingredients_delete_trigger
+    AFTER DELETE ON core_recipe_ingredients
+    REFERENCING OLD TABLE AS changed_links
+    FOR EACH STATEMENT EXECUTE FUNCTION core_recipe_links_changed();
+
+UPDATE core_recipe SET tag_ids = '{}';
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER core_recipe_ingredients_delete_trigger
+    ON core_recipe_ingredients;
+DROP TRIGGER core_recipe_ingredients_insert_trigger
+    ON core_recipe_ingredients;
+DROP TRIGGER core_recipe_tags_delete_trigger ON core_recipe_tags;
+DROP TRIGGER core_recipe_tags_insert_trigger ON core_recipe_tags;
+DROP FUNCTION core_recipe_links_changed();
+DROP TRIGGER core_recipe_link_ids_trigger ON core_recipe;
+DROP FUNCTION core_recipe_link_ids_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_trigram_name_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredient_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='tag_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, editable=False, size=None),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tag_ids'], name='core_recipe_tag_ids_gin_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['ingredient_ids'], name='core_recipe_ingr_ids_gin_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_recipe_link_ids'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', 'price', 'id'], name='core_recipe_user_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', 'time_minutes', 'id'], name='core_recipe_user_time_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+"""
+Drop the (tag_id, recipe_id) and (ingredient_id, recipe_id) indexes that
+0015 added to the through tables.
+
+0015 assumed the through tables were only indexed on (recipe_id, tag_id).
+In fact the auto-created tables from 0008 and 0011 also have single-column
+tag_id and ingredient_id foreign key indexes. Those already serve lookups
+that start from the tag or ingredient side, and the planner picks them
+over the 0015 indexes, which only added write cost to every link change.
+"""
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_price_time_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'DROP INDEX IF EXISTS core_recipe_tags_tag_recipe_idx',
+            'CREATE INDEX core_recipe_tags_tag_recipe_idx '
+            'ON core_recipe_tags (tag_id, recipe_id)',
+        ),
+        migrations.RunSQL(
+            'DROP INDEX IF EXISTS core_recipe_ingr_ingr_recipe_idx',
+            'CREATE INDEX core_recipe_ingr_ingr_recipe_idx '
+            'ON core_recipe_ingredients (ingredient_id, recipe_id)',
+        ),
+    ]
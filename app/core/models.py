@@ -5,6 +5,9 @@ import uuid
 import os
 
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -12,6 +15,8 @@ from django.contrib.auth.models import (
     BaseUserManager,
 )
 
+from core.passwords import hash_password, verify_password
+
 
 def recipe_image_file_path(instance, filename):
     ext = os.path.splitext(filename)[1]
@@ -61,9 +66,38 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = 'username'
 
+    def set_password(self, raw_password):
+        """Set the password, hashed within the password hashing limit"""
+        self.password = hash_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Return whether `raw_password` is correct, verified within the
+        password hashing limit. Saves an upgraded hash when the hasher
+        changed.
+        """
+        valid, must_update = verify_password(raw_password, self.password)
+        if valid and must_update:
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+
+        return valid
+
+
+# Text search configuration of Recipe.search_vector
+SEARCH_CONFIG = 'english'
+
 
 class Recipe(models.Model):
     """Recipie model"""
+
+    class ImageStatus(models.TextChoices):
+        PENDING = 'pending'
+        READY = 'ready'
+        FAILED = 'failed'
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL,
                              on_delete=models.CASCADE)
     title = models.CharField(max_length=255)
@@ -74,6 +108,41 @@ class Recipe(models.Model):
     tags = models.ManyToManyField('Tag')
     ingredients = models.ManyToManyField('Ingredient')
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    image_status = models.CharField(max_length=16, blank=True,
+                                    choices=ImageStatus.choices)
+    image_variants = models.JSONField(default=dict, blank=True)
+    image_sha256 = models.CharField(max_length=64, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Weighted title and description, kept current by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Sorted copies of the tag and ingredient links, kept current by
+    # database triggers, so filters need no join
+    tag_ids = ArrayField(models.BigIntegerField(), default=list,
+                         editable=False)
+    ingredient_ids = ArrayField(models.BigIntegerField(), default=list,
+                                editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-id'],
+                name='core_recipe_user_id_desc_idx',
+            ),
+            # Range filters and orderings, ending in id for the cursor
+            models.Index(
+                fields=['user', 'price', 'id'],
+                name='core_recipe_user_price_idx',
+            ),
+            models.Index(
+                fields=['user', 'time_minutes', 'id'],
+                name='core_recipe_user_time_idx',
+            ),
+            GinIndex(fields=['tag_ids'], name='core_recipe_tag_ids_gin_idx'),
+            GinIndex(
+                fields=['ingredient_ids'],
+                name='core_recipe_ingr_ids_gin_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -86,6 +155,15 @@ class Tag(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_tag_name_per_user',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -97,6 +175,15 @@ class Ingredient(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_ingredient_name_per_user',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -0,0 +1,129 @@
+"""
+Password hashing limited to a few at a time, with back-pressure
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy
+
+from rest_framework import exceptions, status
+
+from core.counters import BufferedCounters
+
+STATS_FIELDS = ('hashes', 'rejected', 'wait_us', 'hash_us', 'queue_depth')
+
+_slots = None
+_lock = threading.Lock()
+_pending = 0
+
+
+class PasswordHashingBusy(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = gettext_lazy(
+        'Too many sign-ins in progress, try again shortly.')
+    default_code = 'password_hashing_busy'
+
+    def __init__(self, detail=None, code=None):
+        super().__init__(detail, code)
+        # Sent as Retry-After by the DRF exception handler
+        self.wait = settings.PASSWORD_HASH_RETRY_AFTER
+
+
+def _get_slots():
+    global _slots
+    if _slots is None:
+        _slots = threading.BoundedSemaphore(
+            settings.PASSWORD_HASH_CONCURRENCY)
+
+    return _slots
+
+
+def stats_cache():
+    return caches[settings.PASSWORD_HASH_STATS_CACHE]
+
+
+def stats_key(field):
+    return f'password-hash:{field}'
+
+
+counters = BufferedCounters(stats_cache)
+
+
+def password_hash_stats():
+    """Return the counters of the password hashes run so far"""
+    counters.flush()
+    counts = stats_cache().get_many([stats_key(f) for f in STATS_FIELDS])
+    return {field: counts.get(stats_key(field), 0) for field in STATS_FIELDS}
+
+
+def queue_depth():
+    """Return the hashes running or waiting in this process"""
+    return _pending
+
+
+def run_hash(func, *args):
+    """
+    Return func(*args), run on the calling thread once fewer than
+    PASSWORD_HASH_CONCURRENCY hashes run in this process, or at once when
+    it is 0. Raises PasswordHashingBusy rather than waiting when
+    PASSWORD_HASH_QUEUE hashes already wait.
+    """
+    global _pending
+    submitted = time.perf_counter()
+    concurrency = settings.PASSWORD_HASH_CONCURRENCY
+    with _lock:
+        depth = _pending
+        if concurrency and depth >= concurrency + settings.PASSWORD_HASH_QUEUE:
+            counters.add({stats_key('rejected'): 1})
+            raise PasswordHashingBusy()
+        _pending += 1
+
+    try:
+        if concurrency:
+            _get_slots().acquire()
+        try:
+            started = time.perf_counter()
+            result = func(*args)
+            finished = time.perf_counter()
+        finally:
+            if concurrency:
+                _get_slots().release()
+    finally:
+        with _lock:
+            _pending -= 1
+
+    counters.add({
+        stats_key('hashes'): 1,
+        stats_key('wait_us'): round((started - submitted) * 1e6),
+        stats_key('hash_us'): round((finished - started) * 1e6),
+        stats_key('queue_depth'): depth,
+    })
+
+    return result
+
+
+def _verify(raw_password, encoded):
+    """Return (valid, whether `encoded` should be rehashed)"""
+    must_update = []
+    valid = check_password(raw_password, encoded,
+                           lambda raw_password: must_update.append(True))
+    return valid, bool(must_update)
+
+
+def hash_password(raw_password):
+    """Return the hash of `raw_password`, as make_password() does"""
+    if raw_password is None:
+        # An unusable password, which involves no hashing
+        return make_password(None)
+    return run_hash(make_password, raw_password)
+
+
+def verify_password(raw_password, encoded):
+    """
+    Return (valid, must_update) for `raw_password` against the hash
+    `encoded`, leaving saving an upgraded hash to the caller
+    """
+    return run_hash(_verify, raw_password, encoded)
@@ -0,0 +1,120 @@
+"""
+Renderers and parsers for the API
+"""
+import codecs
+import math
+import re
+
+import msgpack
+import orjson
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+# The exponent of a number, which orjson writes as 1e16 and 1e-7 where
+# JSONRenderer writes 1e+16 and 1e-07. Starting with a literal keeps the
+# search fast; the digit before it is checked separately.
+re_exponent = re.compile(rb'e[-0-9]')
+
+
+def has_exponent(content):
+    """Return whether JSON `content` may hold a number in exponent notation"""
+    return any(content[match.start() - 1:match.start()].isdigit()
+               for match in re_exponent.finditer(content))
+
+
+def has_non_finite_float(data):
+    """Return whether `data` holds a NaN or infinite float"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, float) and not math.isfinite(value):
+            return True
+
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer output written by orjson.
+
+    Anything orjson does not handle itself goes through DRF's encoder.
+    Indented output, such as the browsable API's, floats in exponent
+    notation and NaN or infinite floats, which orjson writes as null, are
+    left to JSONRenderer.
+    """
+    options = (orjson.OPT_PASSTHROUGH_DATETIME |
+               orjson.OPT_PASSTHROUGH_DATACLASS)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default,
+                               option=self.options)
+        except orjson.JSONEncodeError:
+            # Such as integers beyond 64 bits, which the stdlib handles
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # A match may also be inside a string, which just costs the fallback
+        if has_exponent(ret) or (
+                b'null' in ret and has_non_finite_float(data)):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escape the separators that are invalid in JavaScript strings, as
+        # JSONRenderer does
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ORJSONParser(JSONParser):
+    """Parse JSON request bodies with orjson, in the request's charset"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (ValueError, LookupError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render responses as MessagePack, with the same values as JSON"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = JSONRenderer.encoder_class
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        return msgpack.packb(data, default=self.encoder_class().default)
+
+
+class MessagePackParser(BaseParser):
+    """Parse MessagePack request bodies"""
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read())
+        except ValueError as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
@@ -0,0 +1,123 @@
+"""
+OpenAPI schema generated once per code version and kept rendered
+"""
+import functools
+import hashlib
+import os
+import tempfile
+from importlib.metadata import version as package_version
+from pathlib import Path
+
+from django.conf import settings
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+# Renderers whose output is written by the cache_schema command
+RENDERERS = (OpenApiYamlRenderer, OpenApiJsonRenderer)
+
+_cache = {'version': None, 'schema': None, 'rendered': {}}
+
+
+@functools.lru_cache(maxsize=None)
+def _source_hash():
+    """Hash of the project's Python sources and the schema packages"""
+    digest = hashlib.sha256()
+    base_dir = Path(settings.BASE_DIR)
+    for path in sorted(base_dir.rglob('*.py')):
+        digest.update(str(path.relative_to(base_dir)).encode())
+        digest.update(path.read_bytes())
+    for package in ('django', 'djangorestframework', 'drf-spectacular'):
+        digest.update(f'{package}=={package_version(package)}'.encode())
+
+    return digest.hexdigest()[:16]
+
+
+def code_version():
+    """
+    Return the version of the code the schema describes: CODE_VERSION,
+    such as a commit hash, or else a hash of the sources
+    """
+    return settings.CODE_VERSION or _source_hash()
+
+
+def schema_path(version, renderer):
+    return os.path.join(settings.SCHEMA_CACHE_DIR,
+                        f'openapi-{version}.{renderer.format}')
+
+
+def _current():
+    """Return the memory cache, emptied if the code version changed"""
+    version = code_version()
+    if _cache['version'] != version:
+        _cache.update(version=version, schema=None, rendered={})
+
+    return _cache
+
+
+def generate_schema():
+    """Generate the public schema of the whole API"""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def get_schema():
+    """Return the schema of the current code, generating it once"""
+    cache = _current()
+    if cache['schema'] is None:
+        cache['schema'] = generate_schema()
+
+    return cache['schema']
+
+
+def get_rendered_schema(renderer, media_type=None):
+    """
+    Return the schema rendered by `renderer` for `media_type`, from
+    memory, from the file written for this code version, or rendered now
+    """
+    cache = _current()
+    media_type = media_type or renderer.media_type
+    key = (renderer.format, media_type)
+    if key in cache['rendered']:
+        return cache['rendered'][key]
+
+    # Only the plain media types are kept on disk; parameters such as
+    # indent change the output
+    path = None
+    if media_type == renderer.media_type:
+        path = schema_path(cache['version'], renderer)
+    content = None
+    if path is not None:
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            pass
+    if content is None:
+        content = renderer.render(get_schema(), media_type, {})
+        if path is not None:
+            write_schema_file(path, content)
+
+    cache['rendered'][key] = content
+    return content
+
+
+def write_schema_file(path, content):
+    """Write `content` to `path` atomically, ignoring unwritable dirs"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError:
+        return False
+
+    return True
+
+
+def remove_stale_schema_files(version):
+    """Delete the schema files of other code versions"""
+    current = {schema_path(version, renderer) for renderer in RENDERERS}
+    for path in Path(settings.SCHEMA_CACHE_DIR).glob('openapi-*.*'):
+        if str(path) not in current:
+            path.unlink()
@@ -0,0 +1,42 @@
+"""
+Signal handlers keeping Recipe.updated_at current
+"""
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Recipe, Tag, Ingredient
+
+
+def touch_recipes(**filters):
+    """Bump updated_at on the recipes matching the filters"""
+    Recipe.objects.filter(**filters).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def touch_recipes_on_links_changed(sender, instance, action, reverse,
+                                   pk_set, **kwargs):
+    """Links live in the through tables, so bump the affected recipes"""
+    if action in ('post_add', 'post_remove') and pk_set:
+        if reverse:
+            touch_recipes(pk__in=pk_set)
+        else:
+            touch_recipes(pk=instance.pk)
+    elif action == 'post_clear' and not reverse:
+        touch_recipes(pk=instance.pk)
+    elif action == 'pre_clear' and reverse:
+        # Cleared recipe ids are not sent, so bump them before unlinking
+        touch_recipes(**{f'{instance._meta.model_name}s': instance})
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def touch_recipes_on_name_changed(sender, instance, **kwargs):
+    """Recipes embed tag and ingredient names, so bump the linked ones"""
+    if kwargs.get('created'):
+        return
+
+    touch_recipes(**{f'{sender._meta.model_name}s': instance})
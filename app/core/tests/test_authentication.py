@@ -0,0 +1,127 @@
+"""
+Tests for the cached token authentication
+"""
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import exceptions, status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.authentication import (
+    CachedTokenAuthentication,
+    token_cache,
+    token_cache_key,
+)
+
+ME_URL = reverse('user:me')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """
+    Tests for CachedTokenAuthentication
+    """
+
+    def setUp(self):
+        token_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_cached(self):
+        """
+        Test the token is only looked up on the first request
+        """
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+
+        with self.assertNumQueries(0):
+            user, token = auth.authenticate_credentials(self.token.key)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(token.key, self.token.key)
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.data['username'], self.user.username)
+
+    def test_cached_entry(self):
+        """
+        Test neither the token nor the user's fields are cached
+        """
+        self.client.get(ME_URL)
+
+        cache_key = token_cache_key(self.token.key)
+        self.assertNotIn(self.token.key, cache_key)
+        self.assertEqual(token_cache().get(cache_key), (self.user.pk, True))
+
+    def test_deleted_token_rejected_by_other_worker(self):
+        """
+        Test deleting the token in one worker invalidates the entry
+        cached by another sharing the cache
+        """
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        worker1, worker2 = (FileBasedCache(location.name, {})
+                            for _ in range(2))
+        auth = CachedTokenAuthentication()
+        key = self.token.key
+        with patch('core.authentication.token_cache', return_value=worker1):
+            auth.authenticate_credentials(key)
+        with patch('core.authentication.token_cache', return_value=worker2):
+            self.token.delete()
+
+        with patch('core.authentication.token_cache', return_value=worker1):
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                auth.authenticate_credentials(key)
+
+    def test_invalid_token_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_rejected(self):
+        """
+        Test deleting the token invalidates the cached entry
+        """
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """
+        Test deactivating the user invalidates the cached entry
+        """
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates_cache(self):
+        """
+        Test changing the password drops the cached entry
+        """
+        self.client.get(ME_URL)
+        cache_key = token_cache_key(self.token.key)
+        self.assertIsNotNone(token_cache().get(cache_key))
+
+        res = self.client.patch(ME_URL, {'password': 'newpassword'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(token_cache().get(cache_key))
@@ -0,0 +1,216 @@
+"""
+Tests for the response compression middleware
+"""
+import gzip
+import unittest
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.middleware import (
+    CompressionMiddleware,
+    available_encodings,
+    brotli,
+    choose_encoding,
+    compression_stats,
+    counters,
+    stats_cache,
+    stats_key,
+    zstandard,
+)
+from core.models import Recipe
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+CONTENT = b'{"title": "Sample recipe", "price": "5.50"}' * 100
+
+
+def compress(content=CONTENT, path='/api/recipe/recipes/',
+             accept_encoding='gzip', **headers):
+    """Return the response to a request for `content` via the middleware"""
+    def get_response(request):
+        if isinstance(content, list):
+            return StreamingHttpResponse(iter(content), **headers)
+        return HttpResponse(content, **headers)
+
+    request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+    return CompressionMiddleware(get_response)(request)
+
+
+class ChooseEncodingTests(SimpleTestCase):
+    """Test negotiating the encoding from Accept-Encoding."""
+    encodings = ['br', 'zstd', 'gzip']
+
+    def test_choose_encoding(self):
+        for header, expected in (
+            ('gzip', 'gzip'),
+            ('gzip, br', 'br'),
+            ('gzip;q=1.0, br;q=0.5', 'gzip'),
+            ('zstd, gzip;q=0.9', 'zstd'),
+            ('*', 'br'),
+            ('*;q=0.5, gzip', 'gzip'),
+            ('gzip;q=0', None),
+            ('identity', None),
+            ('', None),
+            ('gzip;q=x, deflate', None),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(choose_encoding(header, self.encodings),
+                                 expected)
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test compressing responses."""
+
+    def setUp(self):
+        counters.flush()
+        stats_cache().clear()
+
+    def test_gzip(self):
+        res = compress()
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(res['Vary'], 'Accept-Encoding')
+        self.assertEqual(res['Content-Length'], str(len(res.content)))
+        self.assertIn('compress;desc="gzip";dur=', res['Server-Timing'])
+        self.assertEqual(gzip.decompress(res.content), CONTENT)
+
+    def test_not_accepted(self):
+        res = compress(accept_encoding='')
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+        self.assertEqual(res['Vary'], 'Accept-Encoding')
+        self.assertEqual(res.content, CONTENT)
+
+    def test_small_response_skipped(self):
+        res = compress(content=b'{}')
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+
+    def test_compressed_media_skipped(self):
+        for res in (compress(content_type='image/jpeg'),
+                    compress(path='/static/media/uploads/recipe/a.json')):
+            with self.subTest(res=res):
+                self.assertFalse(res.has_header('Content-Encoding'))
+                self.assertEqual(res.content, CONTENT)
+
+    def test_already_encoded_skipped(self):
+        def get_response(request):
+            response = HttpResponse(CONTENT)
+            response['Content-Encoding'] = 'br'
+            return response
+
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        res = CompressionMiddleware(get_response)(request)
+
+        self.assertEqual(res.content, CONTENT)
+
+    def test_streaming(self):
+        chunks = [b'{"id": %d}\n' % i * 20 for i in range(50)]
+
+        res = compress(content=chunks)
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertFalse(res.has_header('Content-Length'))
+        body = b''.join(res.streaming_content)
+        self.assertEqual(gzip.decompress(body), b''.join(chunks))
+        self.assertEqual(compression_stats()['gzip']['bytes_in'],
+                         len(b''.join(chunks)))
+
+    def test_etag_weakened(self):
+        def get_response(request):
+            response = HttpResponse(CONTENT)
+            response['ETag'] = '"abc"'
+            return response
+
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        res = CompressionMiddleware(get_response)(request)
+
+        self.assertEqual(res['ETag'], 'W/"abc"')
+
+    def test_stats(self):
+        compress()
+        compress()
+        out = StringIO()
+
+        call_command('compression_stats', stdout=out)
+
+        stats = compression_stats()['gzip']
+        self.assertEqual(stats['responses'], 2)
+        self.assertEqual(stats['bytes_in'], 2 * len(CONTENT))
+        self.assertLess(stats['bytes_out'], stats['bytes_in'])
+        self.assertIn('gzip: 2 responses', out.getvalue())
+
+    @unittest.skipIf(brotli is None, 'brotli is not installed')
+    @override_settings(STATS_FLUSH_INTERVAL=3600)
+    def test_stats_batched(self):
+        compress()
+        compress()
+
+        self.assertIsNone(stats_cache().get(stats_key('gzip', 'responses')))
+        self.assertEqual(compression_stats()['gzip']['responses'], 2)
+
+    def test_brotli(self):
+        res = compress(accept_encoding='gzip, deflate, br')
+
+        self.assertEqual(res['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(res.content), CONTENT)
+
+    @unittest.skipIf(zstandard is None, 'zstandard is not installed')
+    def test_zstd_streaming(self):
+        chunks = [CONTENT, CONTENT]
+
+        res = compress(content=chunks, accept_encoding='zstd')
+
+        self.assertEqual(res['Content-Encoding'], 'zstd')
+        body = b''.join(res.streaming_content)
+        self.assertEqual(
+            zstandard.ZstdDecompressor().decompressobj().decompress(body),
+            CONTENT * 2)
+
+    def test_gzip_always_available(self):
+        self.assertIn('gzip', available_encodings())
+
+
+class CompressedApiTests(TestCase):
+    """Test compression with the recipe API."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(30):
+            Recipe.objects.create(
+                user=self.user,
+                title=f'Sample recipe {i}',
+                time_minutes=5,
+                price=Decimal('5.50'),
+            )
+
+    def test_list_compressed_and_not_modified(self):
+        res = self.client.get(RECIPES_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertTrue(res['ETag'].startswith('W/"'))
+
+        again = self.client.get(RECIPES_URL, HTTP_ACCEPT_ENCODING='gzip',
+                                HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,143 @@
+"""
+Tests for password hashing with back-pressure
+"""
+import threading
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.passwords import (
+    PasswordHashingBusy,
+    counters,
+    password_hash_stats,
+    queue_depth,
+    run_hash,
+    stats_cache,
+)
+
+TOKEN_URL = reverse('user:token')
+
+
+def thread_name():
+    return threading.current_thread().name
+
+
+class PasswordHashingTests(TestCase):
+    """Test hashing passwords within the limit."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='secret123',
+        )
+        counters.flush()
+        stats_cache().clear()
+
+    def fill_slots(self):
+        """Occupy every hashing slot until the returned release() call"""
+        event = threading.Event()
+        threads = [threading.Thread(target=run_hash, args=(event.wait,))
+                   for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        while queue_depth() < len(threads):
+            threading.Event().wait(0.001)
+
+        def release():
+            event.set()
+            for thread in threads:
+                thread.join()
+
+        return release
+
+    def test_hash_on_calling_thread(self):
+        self.assertEqual(run_hash(thread_name), thread_name())
+
+    @override_settings(PASSWORD_HASH_QUEUE=0, PASSWORD_HASH_CONCURRENCY=0)
+    def test_no_limit(self):
+        release = self.fill_slots()
+        try:
+            self.assertTrue(self.user.check_password('secret123'))
+        finally:
+            release()
+
+    def test_check_password(self):
+        self.assertTrue(self.user.check_password('secret123'))
+        self.assertFalse(self.user.check_password('wrong'))
+        self.assertFalse(self.user.check_password(None))
+
+    def test_unusable_password(self):
+        self.user.set_password(None)
+
+        self.assertFalse(self.user.has_usable_password())
+
+    def test_outdated_hash_upgraded(self):
+        self.user.password = make_password('secret123', hasher='pbkdf2_sha1')
+        self.user.save()
+
+        self.assertTrue(self.user.check_password('secret123'))
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+    def test_stats(self):
+        self.user.check_password('secret123')
+        out = StringIO()
+
+        call_command('password_hash_stats', stdout=out)
+
+        stats = password_hash_stats()
+        self.assertEqual(stats['hashes'], 1)
+        self.assertGreater(stats['hash_us'], 0)
+        self.assertIn('1 hashes, 0 rejected', out.getvalue())
+
+    def test_waits_for_slot(self):
+        release = self.fill_slots()
+        results = []
+        waiting = threading.Thread(
+            target=lambda: results.append(self.user.check_password(
+                'secret123')))
+        waiting.start()
+        while queue_depth() < 3:
+            threading.Event().wait(0.001)
+
+        self.assertEqual(results, [])
+        release()
+        waiting.join()
+        self.assertEqual(results, [True])
+        # Queued behind 0, 1 and 2 hashes
+        self.assertEqual(password_hash_stats()['queue_depth'], 3)
+
+    @override_settings(PASSWORD_HASH_QUEUE=0, PASSWORD_HASH_RETRY_AFTER=3)
+    def test_rejected_when_saturated(self):
+        release = self.fill_slots()
+        try:
+            with self.assertRaises(PasswordHashingBusy):
+                self.user.check_password('secret123')
+        finally:
+            release()
+
+        self.assertEqual(password_hash_stats()['rejected'], 1)
+        self.assertTrue(self.user.check_password('secret123'))
+
+    @override_settings(PASSWORD_HASH_QUEUE=0, PASSWORD_HASH_RETRY_AFTER=3)
+    def test_token_unavailable_when_saturated(self):
+        release = self.fill_slots()
+        try:
+            res = APIClient().post(
+                TOKEN_URL, {'username': 'user', 'password': 'secret123'})
+        finally:
+            release()
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res['Retry-After'], '3')
+        self.assertEqual(res.data['detail'].code, 'password_hashing_busy')
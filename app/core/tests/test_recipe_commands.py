@@ -0,0 +1,161 @@
+"""
+Test the recipe export and import commands.
+"""
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.models import Recipe, Tag, Ingredient
+
+
+def create_user(username):
+    return get_user_model().objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='12345678',
+    )
+
+
+def create_recipe(user, **params):
+    defaults = {
+        'title': 'Test recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.50'),
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class RecipeCommandTests(TestCase):
+    """Test exporting and importing recipes as NDJSON."""
+
+    def setUp(self):
+        self.user = create_user('user')
+        self.other_user = create_user('other')
+        tmp = tempfile.NamedTemporaryFile(suffix='.ndjson', delete=False)
+        tmp.close()
+        self.path = tmp.name
+        self.addCleanup(os.remove, self.path)
+
+    def export(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('export_recipes', *args, stdout=out, stderr=err)
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def import_(self, *args):
+        err = StringIO()
+        call_command('import_recipes', self.path, *args, stderr=err)
+        return err.getvalue()
+
+    def test_export(self):
+        recipe = create_recipe(self.user, title='Soup', link='http://x.com')
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Dinner'))
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Salt'))
+
+        records = self.export()
+
+        self.assertEqual(records, [{
+            'id': recipe.id,
+            'user': 'user',
+            'title': 'Soup',
+            'description': '',
+            'time_minutes': 10,
+            'price': '5.50',
+            'link': 'http://x.com',
+            'tags': ['Dinner'],
+            'ingredients': ['Salt'],
+        }])
+
+    def test_export_filters_user_and_resumes(self):
+        r1 = create_recipe(self.user)
+        create_recipe(self.other_user)
+        r3 = create_recipe(self.user)
+
+        records = self.export('--user', 'user', '--after-id', str(r1.id),
+                              '--chunk-size', '1')
+
+        self.assertEqual([r['id'] for r in records], [r3.id])
+
+    def test_export_import_round_trip(self):
+        recipe = create_recipe(self.user, title='Soup')
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Dinner'))
+        create_recipe(self.other_user, title='Stew')
+        call_command('export_recipes', '--output', self.path,
+                     stderr=StringIO())
+        Recipe.objects.all().delete()
+
+        self.import_('--batch-size', '1')
+
+        imported = Recipe.objects.get(user=self.user)
+        self.assertEqual(imported.title, 'Soup')
+        self.assertEqual(imported.price, Decimal('5.50'))
+        self.assertEqual(list(imported.tags.values_list('name', flat=True)),
+                         ['Dinner'])
+        self.assertEqual(Tag.objects.count(), 1)
+        self.assertTrue(
+            Recipe.objects.filter(user=self.other_user, title='Stew').exists())
+
+    def test_import_offset_and_user(self):
+        with open(self.path, 'w') as f:
+            for index, username in enumerate(['user', 'other', 'user']):
+                f.write(json.dumps({
+                    'user': username,
+                    'title': f'Recipe {index}',
+                    'time_minutes': 5,
+                    'price': '1.00',
+                    'tags': ['Quick'],
+                }) + '\n')
+
+        err = self.import_('--offset', '1', '--user', 'user')
+
+        self.assertEqual(list(Recipe.objects.values_list('title', flat=True)),
+                         ['Recipe 2'])
+        self.assertIn('Resume with --offset 3', err)
+
+    def test_import_unknown_user(self):
+        with open(self.path, 'w') as f:
+            f.write(json.dumps({
+                'user': 'nobody',
+                'title': 'Recipe',
+                'time_minutes': 5,
+                'price': '1.00',
+            }) + '\n')
+
+        with self.assertRaises(CommandError):
+            self.import_()
+
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_import_invalid_record(self):
+        valid = {'user': 'user', 'title': 'Recipe', 'time_minutes': 5,
+                 'price': '1.00'}
+        for invalid, error in (
+            ({'user': 'user', 'title': 'Recipe', 'price': '1.00'},
+             "missing 'time_minutes'"),
+            (dict(valid, price='abc'), "invalid 'price'"),
+            (dict(valid, price='12345.00'), "invalid 'price'"),
+            (dict(valid, tags='Quick'), "invalid 'tags'"),
+            ({'title': 'Recipe'}, "invalid 'user'"),
+            (['Recipe'], 'expected a JSON object'),
+        ):
+            with self.subTest(invalid=invalid):
+                Recipe.objects.all().delete()
+                with open(self.path, 'w') as f:
+                    f.write(json.dumps(valid) + '\n')
+                    f.write(json.dumps(invalid) + '\n')
+
+                with self.assertRaisesMessage(CommandError, error) as cm:
+                    self.import_('--batch-size', '1')
+
+                self.assertIn('Line 2: ', str(cm.exception))
+                self.assertIn('resume with --offset 1', str(cm.exception))
+                self.assertEqual(Recipe.objects.count(), 1)
@@ -0,0 +1,114 @@
+"""
+Test the tag and ingredient id arrays kept on recipes.
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from core.models import Recipe, Tag, Ingredient
+
+
+def link_ids(recipe):
+    recipe.refresh_from_db()
+    return recipe.tag_ids, recipe.ingredient_ids
+
+
+class RecipeLinkIdsTests(TestCase):
+    """Test Recipe.tag_ids and ingredient_ids follow the m2m tables."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Test recipe',
+            time_minutes=10,
+            price=Decimal('5.50'),
+        )
+        self.tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        self.tag2 = Tag.objects.create(user=self.user, name='Dinner')
+        self.salt = Ingredient.objects.create(user=self.user, name='Salt')
+
+    def test_add_remove_and_set(self):
+        self.recipe.tags.add(self.tag2, self.tag1)
+        self.recipe.ingredients.add(self.salt)
+        self.assertEqual(link_ids(self.recipe),
+                         ([self.tag1.id, self.tag2.id], [self.salt.id]))
+
+        self.recipe.tags.remove(self.tag1)
+        self.assertEqual(link_ids(self.recipe)[0], [self.tag2.id])
+
+        self.recipe.tags.set([self.tag1])
+        self.assertEqual(link_ids(self.recipe)[0], [self.tag1.id])
+
+    def test_bigint_ids(self):
+        tag = Tag.objects.create(id=3_000_000_000, user=self.user,
+                                 name='Lunch')
+
+        self.recipe.tags.add(tag)
+
+        self.assertEqual(link_ids(self.recipe)[0], [tag.id])
+
+    def test_reverse_clear_and_delete(self):
+        self.recipe.tags.add(self.tag1, self.tag2)
+
+        self.tag1.recipe_set.clear()
+        self.assertEqual(link_ids(self.recipe)[0], [self.tag2.id])
+
+        self.tag2.delete()
+        self.assertEqual(link_ids(self.recipe)[0], [])
+
+    def test_bulk_inserted_links(self):
+        Recipe.ingredients.through.objects.bulk_create([
+            Recipe.ingredients.through(
+                recipe_id=self.recipe.id, ingredient_id=self.salt.id),
+        ])
+
+        self.assertEqual(link_ids(self.recipe)[1], [self.salt.id])
+
+    def test_stale_instance_save_keeps_links(self):
+        stale = Recipe.objects.get(id=self.recipe.id)
+        self.recipe.tags.add(self.tag1)
+
+        stale.title = 'Changed'
+        stale.save()
+
+        self.assertEqual(link_ids(self.recipe)[0], [self.tag1.id])
+
+    def add_tag_without_trigger(self):
+        """Link a tag while triggers are off, leaving tag_ids stale"""
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL session_replication_role = replica')
+            self.recipe.tags.add(self.tag1)
+            cursor.execute('SET LOCAL session_replication_role = DEFAULT')
+        self.assertEqual(link_ids(self.recipe)[0], [])
+
+    def test_check_reports_stale_recipes(self):
+        self.add_tag_without_trigger()
+
+        with self.assertRaisesMessage(CommandError, str(self.recipe.id)):
+            call_command('check_recipe_link_ids', stdout=StringIO())
+
+    def test_check_fix(self):
+        self.add_tag_without_trigger()
+
+        call_command('check_recipe_link_ids', '--fix', stdout=StringIO())
+
+        self.assertEqual(link_ids(self.recipe)[0], [self.tag1.id])
+        call_command('check_recipe_link_ids', stdout=StringIO())
+
+    def test_sync_backfills(self):
+        self.add_tag_without_trigger()
+
+        call_command('sync_recipe_link_ids', '--chunk-size', '1',
+                     stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual(link_ids(self.recipe)[0], [self.tag1.id])
@@ -0,0 +1,185 @@
+"""
+Tests for the orjson and MessagePack renderers and parsers
+"""
+import datetime
+import io
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+
+import msgpack
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+from core.renderers import (
+    MessagePackRenderer,
+    ORJSONParser,
+    ORJSONRenderer,
+)
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+DATA = [
+    OrderedDict([
+        ('id', 1),
+        ('title', 'Crème brûlée \u2028\u2029 "quoted" \\'),
+        ('price', '5.50'),
+        ('amount', Decimal('1.25')),
+        ('created', datetime.datetime(2021, 5, 1, 12, 30, 15, 123456,
+                                      tzinfo=datetime.timezone.utc)),
+        ('day', datetime.date(2021, 5, 1)),
+        ('uuid', uuid.UUID(int=1)),
+        ('label', gettext_lazy('Tags')),
+        ('tags', [{'id': 2, 'name': 'Vegan'}]),
+        ('link', None),
+        ('ratio', 0.1),
+        ('flag', True),
+    ]),
+]
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """Test ORJSONRenderer writes what JSONRenderer writes."""
+
+    def test_same_output(self):
+        self.assertEqual(ORJSONRenderer().render(DATA),
+                         JSONRenderer().render(DATA))
+
+    def test_large_integer_falls_back(self):
+        data = {'id': 2 ** 70}
+
+        self.assertEqual(ORJSONRenderer().render(data),
+                         JSONRenderer().render(data))
+
+    def test_floats(self):
+        floats = [0.0, -0.0, 0.1, 1e-4, 9.9e-5, 1e-7, -2.5e-300, 5e-324,
+                  1e15, 1e16, -1.5e16, 1.7976931348623157e308, 123.456]
+        for data in (floats, {'ratio': 1e-7, 'title': 'Recipe 1e5'}):
+            with self.subTest(data=data):
+                self.assertEqual(ORJSONRenderer().render(data),
+                                 JSONRenderer().render(data))
+
+    def test_non_finite_floats_rejected(self):
+        for value in (float('nan'), float('inf'), float('-inf')):
+            with self.subTest(value=value):
+                data = [{'ratio': value, 'link': None}]
+
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render(data)
+                with self.assertRaises(ValueError):
+                    ORJSONRenderer().render(data)
+
+    def test_indent(self):
+        context = {'indent': 4}
+
+        self.assertEqual(ORJSONRenderer().render(DATA, None, context),
+                         JSONRenderer().render(DATA, None, context))
+
+    def test_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+class ORJSONParserTests(SimpleTestCase):
+    """Test ORJSONParser reads what JSONParser reads."""
+
+    def parse(self, body, encoding='utf-8'):
+        return ORJSONParser().parse(io.BytesIO(body), 'application/json',
+                                    {'encoding': encoding})
+
+    def test_charset(self):
+        self.assertEqual(self.parse('{"title": "Crème"}'.encode('latin-1'),
+                                    'iso-8859-1'),
+                         {'title': 'Crème'})
+        self.assertEqual(self.parse('{"title": "Crème"}'.encode()),
+                         {'title': 'Crème'})
+
+    def test_invalid(self):
+        for body, encoding in ((b'{"ratio": NaN}', 'utf-8'),
+                               (b'{"title": "\xe9"}', 'utf-8'),
+                               (b'{}', 'unknown-charset')):
+            with self.subTest(body=body, encoding=encoding):
+                with self.assertRaises(ParseError):
+                    self.parse(body, encoding)
+
+
+class MessagePackRendererTests(SimpleTestCase):
+    """Test MessagePackRenderer encodes the values JSON would."""
+
+    def test_values(self):
+        data = msgpack.unpackb(MessagePackRenderer().render(DATA))
+
+        self.assertEqual(data[0]['price'], '5.50')
+        self.assertEqual(data[0]['amount'], 1.25)
+        self.assertEqual(data[0]['created'], '2021-05-01T12:30:15.123456Z')
+        self.assertEqual(data[0]['uuid'], str(uuid.UUID(int=1)))
+        self.assertEqual(data[0]['label'], 'Tags')
+        self.assertEqual(data[0]['tags'], [{'id': 2, 'name': 'Vegan'}])
+
+
+class NegotiationApiTests(TestCase):
+    """Test the recipe API speaks JSON and MessagePack."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Sample recipe',
+            time_minutes=5,
+            price=Decimal('5.50'),
+        )
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+    def test_json_by_default(self):
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res['Content-Type'], 'application/json')
+        self.assertEqual(res.content, JSONRenderer().render(res.data))
+
+    def test_msgpack_list(self):
+        res = self.client.get(RECIPES_URL, HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/msgpack')
+        data = msgpack.unpackb(res.content)
+        self.assertEqual(data[0]['price'], '5.50')
+        self.assertEqual(data[0]['tags'][0]['name'], 'Vegan')
+
+    def test_msgpack_create(self):
+        payload = {
+            'title': 'Packed',
+            'time_minutes': 10,
+            'price': '2.50',
+            'tags': [{'name': 'Quick'}],
+        }
+
+        res = self.client.post(RECIPES_URL, msgpack.packb(payload),
+                               content_type='application/msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(id=res.data['id'])
+        self.assertEqual(recipe.price, Decimal('2.50'))
+        self.assertEqual(recipe.tags.get().name, 'Quick')
+
+    def test_invalid_bodies(self):
+        for body, content_type in ((b'{"title": ', 'application/json'),
+                                   (b'\xc1', 'application/msgpack')):
+            with self.subTest(content_type=content_type):
+                res = self.client.post(RECIPES_URL, body,
+                                       content_type=content_type)
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
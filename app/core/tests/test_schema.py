@@ -0,0 +1,107 @@
+"""
+Tests for the cached OpenAPI schema
+"""
+import os
+import shutil
+import tempfile
+import uuid
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core import schema
+from core.schema import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+SCHEMA_URL = reverse('api-schema')
+
+FORMATS = {
+    'application/vnd.oai.openapi': OpenApiYamlRenderer,
+    'application/vnd.oai.openapi+json': OpenApiJsonRenderer,
+}
+
+
+class CachedSchemaTests(TestCase):
+    """Test /api/schema/ serves the schema cached per code version."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.schema_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.schema_dir)
+        self.settings = override_settings(
+            SCHEMA_CACHE_DIR=self.schema_dir,
+            CODE_VERSION=uuid.uuid4().hex,
+        )
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def test_matches_live_generation(self):
+        for media_type in FORMATS:
+            with self.subTest(media_type=media_type):
+                request = APIRequestFactory().get(
+                    SCHEMA_URL, HTTP_ACCEPT=media_type)
+                live = SpectacularAPIView.as_view()(request).render()
+
+                res = self.client.get(SCHEMA_URL, HTTP_ACCEPT=media_type)
+                again = self.client.get(SCHEMA_URL, HTTP_ACCEPT=media_type)
+
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertEqual(res['Content-Type'], live['Content-Type'])
+                self.assertEqual(res.content, live.content)
+                self.assertEqual(again.content, live.content)
+
+    def test_generated_once(self):
+        with mock.patch('core.schema.generate_schema',
+                        wraps=schema.generate_schema) as generate:
+            for media_type in FORMATS:
+                self.client.get(SCHEMA_URL, HTTP_ACCEPT=media_type)
+                self.client.get(SCHEMA_URL, HTTP_ACCEPT=media_type)
+
+        self.assertEqual(generate.call_count, 1)
+
+    def test_not_modified(self):
+        res = self.client.get(SCHEMA_URL)
+
+        again = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again.content, b'')
+
+    def test_code_version_change(self):
+        res = self.client.get(SCHEMA_URL)
+
+        with override_settings(CODE_VERSION='next'):
+            changed = self.client.get(SCHEMA_URL,
+                                      HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], res['ETag'])
+        path = schema.schema_path('next', OpenApiYamlRenderer())
+        self.assertTrue(os.path.exists(path))
+
+    def test_served_from_file(self):
+        path = schema.schema_path(schema.code_version(),
+                                  OpenApiYamlRenderer())
+        with open(path, 'wb') as f:
+            f.write(b'openapi: 3.0.3\n')
+
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.content, b'openapi: 3.0.3\n')
+
+    def test_cache_schema_command(self):
+        stale = os.path.join(self.schema_dir, 'openapi-old.yaml')
+        open(stale, 'wb').close()
+
+        call_command('cache_schema', stdout=StringIO())
+
+        for renderer_class in FORMATS.values():
+            path = schema.schema_path(schema.code_version(), renderer_class())
+            self.assertTrue(os.path.exists(path))
+        self.assertFalse(os.path.exists(stale))
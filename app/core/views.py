@@ -1,3 +1,36 @@
-# from django.shortcuts import render
+"""
+Views for the API schema
+"""
+from django.conf import settings
+from django.http import HttpResponse
 
-# Create your views here.
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+from core.schema import code_version, get_rendered_schema
+from recipe.conditional import conditional_response
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    SpectacularAPIView serving the schema rendered once per code version,
+    with an ETag for conditional requests
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if (self.urlconf is not None or self.api_version is not None or
+                (settings.USE_I18N and request.GET.get('lang'))):
+            return super().get(request, *args, **kwargs)
+
+        def respond():
+            renderer = request.accepted_renderer
+            media_type = request.accepted_media_type
+            content_type = media_type
+            if renderer.charset:
+                content_type = f'{media_type}; charset={renderer.charset}'
+
+            return HttpResponse(get_rendered_schema(renderer, media_type),
+                                content_type=content_type)
+
+        return conditional_response(request, code_version(), None, respond)
@@ -0,0 +1,98 @@
+"""
+Async variants of the recipe read endpoints for ASGI
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern, URLResolver
+
+# Routes whose GET requests run on the read pool
+ASYNC_READ_ROUTES = {
+    'recipe-list',
+    'recipe-detail',
+    'tag-list',
+    'ingredient-list',
+}
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_executor = None
+
+
+def read_executor():
+    """Return the pool running read requests, bounded to ASYNC_READ_THREADS"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_READ_THREADS,
+            thread_name_prefix='api-read',
+        )
+
+    return _executor
+
+
+def _run_read(view, request, args, kwargs):
+    """Run `view` and render its response on a read pool thread"""
+    # Pool threads hold their own connections, which the request signals
+    # of the handler thread never see; apply CONN_MAX_AGE here instead
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, 'render', None)):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """
+    Return an async view running the sync `view` on the read pool for
+    read requests. Other methods run as Django runs any sync view under
+    ASGI, one at a time on the shared thread.
+    """
+    write_view = sync_to_async(view)
+
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in READ_METHODS:
+            return await write_view(request, *args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            read_executor(),
+            functools.partial(_run_read, view, request, args, kwargs),
+        )
+
+    # Keep csrf_exempt and the attributes DRF and the schema look up
+    wrapper.__dict__.update(view.__dict__)
+    wrapper.__name__ = view.__name__
+    wrapper.__doc__ = view.__doc__
+    return wrapper
+
+
+def async_read_patterns(patterns):
+    """Return `patterns` with the ASYNC_READ_ROUTES views made async"""
+    result = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(
+                pattern.pattern,
+                async_read_patterns(pattern.url_patterns),
+                pattern.default_kwargs,
+                pattern.app_name,
+                pattern.namespace,
+            )
+        elif pattern.name in ASYNC_READ_ROUTES:
+            pattern = URLPattern(
+                pattern.pattern,
+                async_read_view(pattern.callback),
+                pattern.default_args,
+                pattern.name,
+            )
+        result.append(pattern)
+
+    return result
@@ -0,0 +1,106 @@
+"""
+Per-user response cache for the Recipe APIs
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.counters import increment
+
+HITS_KEY = 'response-cache:hits'
+MISSES_KEY = 'response-cache:misses'
+
+
+def response_cache():
+    return caches[settings.RESPONSE_CACHE]
+
+
+def version_key(user_id):
+    return f'response-cache:version:{user_id}'
+
+
+def get_user_cache_version(user_id):
+    """Return the user's current cache version, creating one if missing"""
+    cache = response_cache()
+    version = cache.get(version_key(user_id))
+    if version is None:
+        cache.add(version_key(user_id), uuid.uuid4().hex, None)
+        version = cache.get(version_key(user_id))
+
+    return version
+
+
+def invalidate_user(user_id):
+    """
+    Move the user to a new cache version, so their cached responses are
+    no longer addressed and age out of the cache
+    """
+    response_cache().set(version_key(user_id), uuid.uuid4().hex, None)
+
+
+def response_cache_stats():
+    """Return the hit and miss counters of the response cache"""
+    counts = response_cache().get_many([HITS_KEY, MISSES_KEY])
+
+    return {
+        'hits': counts.get(HITS_KEY, 0),
+        'misses': counts.get(MISSES_KEY, 0),
+    }
+
+
+def cached_response(request, view, respond):
+    """
+    Return the cached data for this user, view and URL, or build the
+    response with `respond` and cache its data if it is a 200
+    """
+    cache = response_cache()
+    version = get_user_cache_version(request.user.pk)
+    url = f'{request.build_absolute_uri()}|{request.accepted_media_type}'
+    key = 'response-cache:{}:{}:{}:{}'.format(
+        request.user.pk,
+        version,
+        view.basename,
+        hashlib.sha1(url.encode()).hexdigest(),
+    )
+
+    data = cache.get(key)
+    if data is not None:
+        increment(cache, HITS_KEY)
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    increment(cache, MISSES_KEY)
+    response = respond()
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(key, response.data)
+    response['X-Cache'] = 'MISS'
+
+    return response
+
+
+class CachedListMixin:
+    """Serve list requests from the per-user response cache"""
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            request, self,
+            lambda: super(CachedListMixin, self).list(
+                request, *args, **kwargs),
+        )
+
+
+class CachedRetrieveMixin:
+    """Serve retrieve requests from the per-user response cache"""
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            request, self,
+            lambda: super(CachedRetrieveMixin, self).retrieve(
+                request, *args, **kwargs),
+        )
@@ -0,0 +1,104 @@
+"""
+Conditional GET support for the Recipe APIs
+"""
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import CharField, Count, Max, Value
+from django.http import HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, quote_etag
+
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+
+
+def get_user_version(user):
+    """
+    Return (version, last modified) of all recipe data owned by the user,
+    read in a single query. Row counts are part of the version so that
+    deletions change it too.
+    """
+    querysets = [
+        model.objects.filter(user=user).order_by().values('user').annotate(
+            model=Value(model._meta.model_name, output_field=CharField()),
+            modified=Max('updated_at'),
+            count=Count('id'),
+        ).values_list('model', 'modified', 'count')
+        for model in (Recipe, Tag, Ingredient)
+    ]
+    rows = sorted(querysets[0].union(*querysets[1:], all=True))
+    version = ';'.join(
+        f'{model}:{modified.isoformat()}:{count}'
+        for model, modified, count in rows
+    )
+    last_modified = max((row[1] for row in rows), default=None)
+
+    return version, last_modified
+
+
+def conditional_response(request, version, last_modified, respond):
+    """
+    Return 304 if the request's If-None-Match matches the ETag for
+    `version`, otherwise the response built by `respond`.
+
+    Only the ETag decides on 304: Last-Modified is informational, since
+    deleting a row does not move it forward.
+    """
+    key = f'{version}|{request.get_full_path()}|{request.accepted_media_type}'
+    etag = quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+    # Weak comparison, as compression marks the ETag weak
+    matches = {
+        tag[2:] if tag.startswith('W/') else tag
+        for tag in parse_etags(request.headers.get('If-None-Match', ''))
+    }
+    if etag in matches:
+        response = HttpResponseNotModified()
+    else:
+        response = respond()
+
+    if response.status_code in (status.HTTP_200_OK,
+                                status.HTTP_304_NOT_MODIFIED):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+
+    return response
+
+
+class ConditionalListMixin:
+    """Answer list requests with an ETag from the user's data version"""
+
+    def list(self, request, *args, **kwargs):
+        version, last_modified = get_user_version(request.user)
+
+        return conditional_response(
+            request, version, last_modified,
+            lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs),
+        )
+
+
+class ConditionalRetrieveMixin:
+    """Answer retrieve requests with an ETag from the object's updated_at"""
+
+    def retrieve(self, request, *args, **kwargs):
+        def respond():
+            return super(ConditionalRetrieveMixin, self).retrieve(
+                request, *args, **kwargs)
+
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            last_modified = self.queryset.filter(
+                user=request.user, **{self.lookup_field: lookup},
+            ).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError, ValidationError):
+            last_modified = None
+
+        # Let the regular view answer missing or malformed lookups
+        if last_modified is None:
+            return respond()
+
+        version = f'{lookup}:{last_modified.isoformat()}'
+        return conditional_response(request, version, last_modified, respond)
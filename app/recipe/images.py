@@ -0,0 +1,168 @@
+"""
+Background processing of uploaded recipe images
+"""
+import functools
+import io
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps, features
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+from core.models import Recipe
+
+# Longest edge in pixels of each variant produced for an upload
+IMAGE_VARIANTS = {
+    'thumbnail': 160,
+    'small': 480,
+    'large': 1280,
+}
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_results = queue.SimpleQueue()
+
+
+def variant_formats():
+    """Return the (format, extension, save options) to encode variants in"""
+    formats = [('JPEG', 'jpg', {'quality': 85, 'progressive': True,
+                                'optimize': True})]
+    if features.check('webp'):
+        formats.append(('WEBP', 'webp', {'quality': 80, 'method': 4}))
+
+    return formats
+
+
+def process_image(name):
+    """
+    Create the resized variants of the stored image `name` and return
+    their storage names as {variant: {extension: name}}.
+
+    Variants are re-encoded from pixel data only, which strips EXIF and
+    other metadata after the EXIF orientation has been applied.
+    """
+    with default_storage.open(name) as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    root = os.path.splitext(name)[0]
+    variants = {}
+    for variant, size in IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        variants[variant] = {}
+        for image_format, extension, options in variant_formats():
+            buffer = io.BytesIO()
+            resized.save(buffer, format=image_format, **options)
+            variants[variant][extension] = default_storage.save(
+                f'{root}_{variant}.{extension}',
+                ContentFile(buffer.getvalue()),
+            )
+
+    return variants
+
+
+def _delete_variants(variants):
+    for files in variants.values():
+        for name in files.values():
+            default_storage.delete(name)
+
+
+def _store_result(recipe_id, name, variants):
+    """
+    Record the processing result unless the image changed meanwhile, then
+    delete the variant files no longer recorded
+    """
+    with transaction.atomic():
+        recipe = Recipe.objects.select_for_update().filter(
+            pk=recipe_id, image=name).first()
+        if recipe is None:
+            stale = variants or {}
+        else:
+            stale = recipe.image_variants
+            if variants is None:
+                recipe.image_status = Recipe.ImageStatus.FAILED
+                recipe.image_variants = {}
+            else:
+                recipe.image_status = Recipe.ImageStatus.READY
+                recipe.image_variants = variants
+            recipe.save(update_fields=['image_status', 'image_variants',
+                                       'updated_at'])
+
+    _delete_variants(stale)
+
+
+def process_recipe_image(recipe_id, name):
+    """Process the image `name` of a recipe and record the result"""
+    try:
+        variants = process_image(name)
+    except (OSError, ValueError):
+        logger.exception('Processing image %s of recipe %s failed',
+                         name, recipe_id)
+        variants = None
+    _store_result(recipe_id, name, variants)
+
+
+def _store_results():
+    """
+    Record the results handed back by the pool, on a thread of its own
+    rather than the pool's result thread, so they are stored with a
+    usable connection and failures are logged
+    """
+    while True:
+        recipe_id, name, future = _results.get()
+        close_old_connections()
+        try:
+            error = future.exception()
+            if error is not None:
+                logger.error('Processing image %s of recipe %s failed',
+                             name, recipe_id, exc_info=error)
+            _store_result(recipe_id, name, None if error else future.result())
+        except Exception:
+            logger.exception('Storing variants of recipe %s failed',
+                             recipe_id)
+
+
+def _on_done(recipe_id, name, future):
+    _results.put((recipe_id, name, future))
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESSING_WORKERS)
+        threading.Thread(target=_store_results, name='image-results',
+                         daemon=True).start()
+
+    return _executor
+
+
+def _submit(recipe_id, name):
+    if not settings.IMAGE_PROCESSING_WORKERS:
+        process_recipe_image(recipe_id, name)
+        return
+
+    future = _get_executor().submit(process_image, name)
+    future.add_done_callback(functools.partial(_on_done, recipe_id, name))
+
+
+def schedule_image_processing(recipe):
+    """
+    Mark the recipe's image as pending and process it once the current
+    transaction commits, in the worker pool or inline when
+    IMAGE_PROCESSING_WORKERS is 0. The variants of the previous image are
+    kept until the new ones replace them.
+    """
+    recipe.image_status = Recipe.ImageStatus.PENDING
+    recipe.save(update_fields=['image_status', 'updated_at'])
+    transaction.on_commit(
+        functools.partial(_submit, recipe.pk, recipe.image.name))
@@ -0,0 +1,104 @@
+"""
+Django command to compare recipe list throughput of the WSGI and ASGI paths.
+"""
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+
+from recipe.management.commands.benchmark_recipe_list import create_recipes
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the async read endpoints."""
+    help = (
+        'Request a page of recipes many times, one request at a time as a '
+        'WSGI worker serves them, then with concurrent requests through the '
+        'async read endpoints of app.asgi, and report the requests per '
+        'second of each. The generated data is deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument(
+            '--latency-ms', type=float, default=2.0,
+            help='Delay added to every query, as the round trip to a '
+                 'database on another host would.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        user = create_recipes(options['recipes'])
+        token = Token.objects.create(user=user)
+        latency = options['latency_ms'] / 1000
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_delay(sender, connection, **kwargs):
+            connection.execute_wrappers.append(delay)
+
+        connection.execute_wrappers.append(delay)
+        connection_created.connect(add_delay)
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                wsgi = self._time_wsgi(token, options)
+                asgi = self._time_asgi(token, options)
+        finally:
+            connection_created.disconnect(add_delay)
+            connection.execute_wrappers.remove(delay)
+            user.delete()
+
+        self.stdout.write(f'WSGI, one request at a time: {wsgi:.0f} req/s')
+        self.stdout.write(
+            f'ASGI, {options["concurrency"]} concurrent requests, '
+            f'{settings.ASYNC_READ_THREADS} read threads: {asgi:.0f} req/s')
+        self.stdout.write(f'speedup: {asgi / wsgi:.2f}x')
+
+    def _urls(self, options):
+        # Distinct URLs, so neither the response cache nor ETags answer
+        url = reverse('recipe:recipe-list')
+        return [
+            f'{url}?page_size={options["page_size"]}&n={i}'
+            for i in range(options['requests'])
+        ]
+
+    def _check(self, response):
+        if response.status_code != 200:
+            raise CommandError(f'Request failed with {response.status_code}')
+
+    def _time_wsgi(self, token, options):
+        client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+        started = time.perf_counter()
+        for url in self._urls(options):
+            self._check(client.get(url))
+
+        return options['requests'] / (time.perf_counter() - started)
+
+    def _time_asgi(self, token, options):
+        async def run():
+            client = AsyncClient()
+            auth = f'Token {token.key}'
+            semaphore = asyncio.Semaphore(options['concurrency'])
+
+            async def get(url):
+                async with semaphore:
+                    self._check(await client.get(url, AUTHORIZATION=auth))
+
+            started = time.perf_counter()
+            await asyncio.gather(*(get(url) for url in self._urls(options)))
+            return options['requests'] / (time.perf_counter() - started)
+
+        with override_settings(ROOT_URLCONF='app.asgi_urls'):
+            return asyncio.run(run())
@@ -0,0 +1,109 @@
+"""
+Django command to time the recipe list serializers against each other.
+"""
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.serializers import RecipeSerializer, RecipeRowListSerializer
+from recipe.views import NESTED_FIELDS, nested_prefetches
+
+
+def create_recipes(count):
+    """Create `count` recipes with links for a new benchmark user"""
+    rng = random.Random(0)
+    user = get_user_model().objects.create_user(
+        username='benchmark_recipe_list',
+        email='benchmark_recipe_list@example.com',
+    )
+    tags = Tag.objects.bulk_create(
+        [Tag(user=user, name=f'Tag {i}') for i in range(20)])
+    ingredients = Ingredient.objects.bulk_create(
+        [Ingredient(user=user, name=f'Ingredient {i}') for i in range(50)])
+    recipes = Recipe.objects.bulk_create([
+        Recipe(
+            user=user,
+            title=f'Recipe {i}',
+            time_minutes=rng.randint(1, 240),
+            price=Decimal(rng.randint(100, 9999)) / 100,
+            link=f'https://example.com/recipes/{i}',
+        )
+        for i in range(count)
+    ])
+    for field, items in (('tags', tags), ('ingredients', ingredients)):
+        through = getattr(Recipe, field).through
+        column = f'{items[0]._meta.model_name}_id'
+        through.objects.bulk_create([
+            through(recipe_id=recipe.id, **{column: item.id})
+            for recipe in recipes
+            for item in rng.sample(items, rng.randint(1, 6))
+        ])
+
+    return user
+
+
+def best_time(func, *args, repeat=5):
+    """Return the fastest of `repeat` calls of func(*args), in seconds"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def render_instances(queryset):
+    recipes = queryset.prefetch_related(*nested_prefetches(NESTED_FIELDS))
+    return JSONRenderer().render(RecipeSerializer(recipes, many=True).data)
+
+
+def render_rows(queryset):
+    columns = RecipeRowListSerializer.get_columns(RecipeSerializer.Meta.fields)
+    rows = queryset.values(*columns)
+    return JSONRenderer().render(RecipeRowListSerializer(rows).data)
+
+
+class Command(BaseCommand):
+    """Django command to benchmark recipe list serialization."""
+    help = (
+        'Render a page of generated recipes with RecipeSerializer and with '
+        'RecipeRowListSerializer, and report the time of each. The data is '
+        'created in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Report the best of this many runs.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        with transaction.atomic():
+            user = create_recipes(options['recipes'])
+            queryset = Recipe.objects.filter(user=user).order_by('-id')
+
+            if render_rows(queryset) != render_instances(queryset):
+                self.stderr.write('Serializer output differs.')
+            timings = {
+                name: best_time(render, queryset, repeat=options['repeat'])
+                for name, render in (('RecipeSerializer', render_instances),
+                                     ('RecipeRowListSerializer', render_rows))
+            }
+            transaction.set_rollback(True)
+
+        for name, seconds in timings.items():
+            self.stdout.write(f'{name}: {seconds * 1000:.1f} ms')
+        speedup = (timings['RecipeSerializer'] /
+                   timings['RecipeRowListSerializer'])
+        self.stdout.write(f'speedup: {speedup:.2f}x')
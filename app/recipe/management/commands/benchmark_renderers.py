@@ -0,0 +1,55 @@
+"""
+Django command to time the API renderers on recipe lists.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Recipe
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+from recipe.management.commands.benchmark_recipe_list import (
+    best_time,
+    create_recipes,
+)
+from recipe.serializers import RecipeSerializer, RecipeRowListSerializer
+
+RENDERERS = (JSONRenderer, ORJSONRenderer, MessagePackRenderer)
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the API renderers."""
+    help = (
+        'Render a list of generated recipes with each renderer and report '
+        'its throughput. The data is created in a transaction that is '
+        'rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Report the best of this many runs.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        with transaction.atomic():
+            user = create_recipes(options['recipes'])
+            rows = Recipe.objects.filter(user=user).order_by('-id').values(
+                *RecipeRowListSerializer.get_columns(
+                    RecipeSerializer.Meta.fields))
+            data = RecipeRowListSerializer(rows).data
+            transaction.set_rollback(True)
+
+        if ORJSONRenderer().render(data) != JSONRenderer().render(data):
+            self.stderr.write('ORJSONRenderer output differs.')
+        for renderer_class in RENDERERS:
+            renderer = renderer_class()
+            size = len(renderer.render(data))
+            seconds = best_time(renderer.render, data,
+                                repeat=options['repeat'])
+            self.stdout.write(
+                f'{renderer_class.__name__}: {seconds * 1000:.2f} ms, '
+                f'{size / seconds / 1e6:.0f} MB/s, {size} bytes'
+            )
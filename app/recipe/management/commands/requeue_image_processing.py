@@ -0,0 +1,42 @@
+"""
+Django command to process recipe images left pending.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Recipe
+
+from recipe.images import process_recipe_image
+
+
+class Command(BaseCommand):
+    """Django command to process images whose processing was lost."""
+    help = (
+        'Process the images of recipes still pending, such as those '
+        'whose worker exited before recording a result.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=600,
+            help='Skip recipes updated less than this many seconds ago, '
+                 'which workers may still be processing.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        before = timezone.now() - timedelta(seconds=options['min_age'])
+        pending = Recipe.objects.filter(
+            image_status=Recipe.ImageStatus.PENDING, updated_at__lt=before,
+        ).exclude(image=None).exclude(image='').order_by(
+            'id').values_list('id', 'image')
+
+        count = 0
+        for recipe_id, name in pending.iterator():
+            process_recipe_image(recipe_id, name)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {count} pending images.'))
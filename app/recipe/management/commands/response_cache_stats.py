@@ -0,0 +1,21 @@
+"""
+Django command to show the response cache hit and miss counters.
+"""
+from django.core.management.base import BaseCommand
+
+from recipe.cache import response_cache_stats
+
+
+class Command(BaseCommand):
+    """Django command to show response cache counters."""
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        stats = response_cache_stats()
+        lookups = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / lookups if lookups else 0
+        self.stdout.write(
+            f'hits: {stats["hits"]}\n'
+            f'misses: {stats["misses"]}\n'
+            f'hit ratio: {ratio:.2%}'
+        )
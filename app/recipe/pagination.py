@@ -0,0 +1,143 @@
+"""
+Pagination for the Recipe APIs
+"""
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Field, Func, Value
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class Row(Func):
+    """A row value, compared column by column"""
+    function = 'ROW'
+    output_field = Field()
+
+
+def reverse_ordering(ordering):
+    return tuple(
+        name[1:] if name.startswith('-') else f'-{name}'
+        for name in ordering
+    )
+
+
+class OptInCursorPagination(CursorPagination):
+    """
+    Cursor pagination that is only applied when the client asks for it
+    with `cursor` or `page_size`, so unpaginated clients keep getting
+    a plain list.
+
+    The cursor holds the values of every ordering field of the boundary
+    row, and the next page starts after them in a single row comparison.
+    Orderings must end in a unique field and run in one direction, so a
+    composite index on them serves any page without an offset.
+    """
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate only if the request opted in"""
+        params = request.query_params
+        if (self.cursor_query_param not in params and
+                self.page_size_query_param not in params):
+            return None
+
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        ordering = self.ordering
+        if reverse:
+            ordering = reverse_ordering(ordering)
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = self._filter_after(queryset, ordering,
+                                          current_position)
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+        following_position = None
+        if has_following_position:
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _filter_after(self, queryset, ordering, position):
+        """Keep the rows following `position` in `ordering`"""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        names = [name.lstrip('-') for name in ordering]
+        descending = {name.startswith('-') for name in ordering}
+        assert len(descending) == 1, (
+            'Cursor orderings must run in one direction.'
+        )
+        keys = []
+        for name, value in zip(names, values):
+            field = queryset.query.resolve_ref(name).output_field
+            try:
+                keys.append(Value(field.to_python(value), output_field=field))
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+
+        lookup = 'lt' if descending.pop() else 'gt'
+        return queryset.alias(cursor_row=Row(*names)).filter(
+            **{f'cursor_row__{lookup}': Row(*keys)})
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for name in ordering:
+            name = name.lstrip('-')
+            if isinstance(instance, dict):
+                value = instance[name]
+            else:
+                value = getattr(instance, name)
+            values.append(str(value))
+
+        return json.dumps(values)
+
+
+class RecipeCursorPagination(OptInCursorPagination):
+    """
+    Cursor pagination keyed on recipe id, or on the queryset's own
+    ordering when it has one, such as search rank or price
+    """
+    ordering = '-id'
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(queryset.query.order_by) or (self.ordering,)
+
+
+class NameCursorPagination(OptInCursorPagination):
+    """Cursor pagination keyed on name for tags and ingredients"""
+    ordering = ('-name', '-id')
@@ -1,10 +1,59 @@
 """
 Serializer for Recipe APIs
 """
+import hashlib
+from collections import OrderedDict
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
 
 from rest_framework import serializers
 
 from core.models import Recipe, Tag, Ingredient
+from recipe.cache import invalidate_user
+from recipe.uploads import HEADER_BYTES, invalid_image, read_image_header
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """URLs of the resized image variants, by variant and extension"""
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        urls = {}
+        for variant, files in value.items():
+            urls[variant] = {}
+            for extension, name in files.items():
+                url = default_storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls[variant][extension] = url
+
+        return urls
+
+
+class StreamedImageField(serializers.ImageField):
+    """
+    Image field checked from the file header instead of Pillow's verify,
+    reusing the checks ImageUploadHandler already made while streaming
+    """
+
+    def to_internal_value(self, data):
+        file = serializers.FileField.to_internal_value(self, data)
+        if not hasattr(file, 'image_format'):
+            info = read_image_header(file.read(HEADER_BYTES))
+            if info is None:
+                raise invalid_image(self.error_messages['invalid_image'])
+            file.image_format, file.image_size = info
+            file.seek(0)
+        if not hasattr(file, 'sha256'):
+            sha256 = hashlib.sha256()
+            for chunk in file.chunks():
+                sha256.update(chunk)
+            file.sha256 = sha256.hexdigest()
+            file.seek(0)
+
+        return file
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -23,7 +72,114 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Serialize only the fields named in the `fields` context entry, when
+    the view passes one
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested is None:
+            return fields
+
+        return OrderedDict(
+            (name, field) for name, field in fields.items()
+            if name in requested
+        )
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    """
+    Create and update many recipes in one transaction, resolving their
+    tags and ingredients once for the whole batch
+    """
+
+    def _set_links(self, recipes, related, field, model):
+        """
+        Make the `field` links of each recipe match its related items,
+        skipping recipes whose items are None
+        """
+        targets = [
+            (recipe, items) for recipe, items in zip(recipes, related)
+            if items is not None
+        ]
+        if not targets:
+            return
+
+        names = [item for _, items in targets for item in items]
+        by_name = {
+            obj.name: obj
+            for obj in self.child._get_or_create_named(model, names)
+        }
+        through = getattr(Recipe, field).through
+        column = f'{model._meta.model_name}_id'
+        wanted = {
+            (recipe.pk, by_name[item['name']].pk)
+            for recipe, items in targets for item in items
+        }
+        existing = {
+            (recipe_id, target_id): link_id
+            for link_id, recipe_id, target_id in through.objects.filter(
+                recipe_id__in=[recipe.pk for recipe, _ in targets],
+            ).values_list('id', 'recipe_id', column)
+        }
+
+        stale = [
+            link_id for pair, link_id in existing.items()
+            if pair not in wanted
+        ]
+        if stale:
+            through.objects.filter(id__in=stale).delete()
+        through.objects.bulk_create([
+            through(recipe_id=recipe_id, **{column: target_id})
+            for recipe_id, target_id in wanted - existing.keys()
+        ])
+
+    def _save_links(self, recipes, validated_data):
+        for field, model in (('tags', Tag), ('ingredients', Ingredient)):
+            related = [attrs.pop(field, None) for attrs in validated_data]
+            self._set_links(recipes, related, field, model)
+
+    def create(self, validated_data):
+        links = [
+            {field: attrs.pop(field, None)
+             for field in ('tags', 'ingredients')}
+            for attrs in validated_data
+        ]
+        recipes = [Recipe(**attrs) for attrs in validated_data]
+
+        with transaction.atomic():
+            Recipe.objects.bulk_create(recipes)
+            self._save_links(recipes, links)
+
+        invalidate_user(self.context['request'].user.pk)
+        return recipes
+
+    def update(self, instances, validated_data):
+        links = [
+            {field: attrs.pop(field)
+             for field in ('tags', 'ingredients') if field in attrs}
+            for attrs in validated_data
+        ]
+        fields = {'updated_at'}
+        now = timezone.now()
+        for recipe, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(recipe, attr, value)
+            fields.update(attrs)
+            recipe.updated_at = now
+
+        with transaction.atomic():
+            Recipe.objects.bulk_update(instances, fields)
+            self._save_links(instances, links)
+
+        invalidate_user(self.context['request'].user.pk)
+        return instances
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Recipe objects"""
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
@@ -33,24 +189,35 @@ class RecipeSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'time_minutes',
                   'price', 'link', 'tags', 'ingredients']
         read_only_fields = ['id']
+        list_serializer_class = RecipeListSerializer
 
-    def _get_or_create_tags(self, tags, recipe):
+    def _get_or_create_named(self, model, items):
+        """
+        Return the user's objects for the given names, inserting the
+        missing ones in bulk
+        """
         auth_user = self.context['request'].user
-        for tag in tags:
-            tag_obj, _ = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
+        names = {item['name'] for item in items}
+        if not names:
+            return []
+
+        objs = list(model.objects.filter(user=auth_user, name__in=names))
+        missing = names - {obj.name for obj in objs}
+        if missing:
+            model.objects.bulk_create(
+                [model(user=auth_user, name=name) for name in missing],
+                ignore_conflicts=True,
             )
-            recipe.tags.add(tag_obj)
+            objs += model.objects.filter(user=auth_user, name__in=missing)
+
+        return objs
+
+    def _get_or_create_tags(self, tags, recipe):
+        recipe.tags.add(*self._get_or_create_named(Tag, tags))
 
     def _get_or_create_ingredients(self, ingredients, recipe):
-        auth_user = self.context['request'].user
-        for ingredient in ingredients:
-            ingredient_obj, _ = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient,
-            )
-            recipe.ingredients.add(ingredient_obj)
+        recipe.ingredients.add(
+            *self._get_or_create_named(Ingredient, ingredients))
 
     def create(self, validated_data):
         tags = validated_data.pop('tags', [])
@@ -62,32 +229,123 @@ class RecipeSerializer(serializers.ModelSerializer):
         return recipe
 
     def update(self, instance, validated_data):
-        tags = validated_data.pop('tags', [])
-        ingredients = validated_data.pop('ingredients', [])
+        tags = validated_data.pop('tags', None)
+        ingredients = validated_data.pop('ingredients', None)
 
+        # set() only deletes and inserts the join rows that changed
         if tags is not None:
-            instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
+            instance.tags.set(self._get_or_create_named(Tag, tags))
 
         if ingredients is not None:
-            instance.ingredients.clear()
-            self._get_or_create_ingredients(ingredients, instance)
+            instance.ingredients.set(
+                self._get_or_create_named(Ingredient, ingredients))
 
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
+        changed = [
+            attr for attr, value in validated_data.items()
+            if getattr(instance, attr) != value
+        ]
+        for attr in changed:
+            setattr(instance, attr, validated_data[attr])
 
-        instance.save()
+        if changed:
+            instance.save(update_fields=changed + ['updated_at'])
         return instance
 
 
+class RecipeRowListSerializer(serializers.ListSerializer):
+    """
+    Read-only recipe list built from values() rows instead of model
+    instances, giving the same output as RecipeSerializer(many=True).
+
+    Nested tags and ingredients come from the rows' tag_ids and
+    ingredient_ids, with one name lookup per relation for the whole list.
+    """
+    child = RecipeSerializer()
+    nested = {
+        'tags': ('tag_ids', Tag),
+        'ingredients': ('ingredient_ids', Ingredient),
+    }
+
+    @classmethod
+    def get_columns(cls, names):
+        """Return the values() columns needed to render fields `names`"""
+        columns = {field.name for field in Recipe._meta.concrete_fields}
+        return {'id'} | (set(names) & columns) | {
+            cls.nested[name][0] for name in names if name in cls.nested}
+
+    def _get_nested(self, rows, name):
+        """Return {id: representation} of the items listed in `rows`"""
+        column, model = self.nested[name]
+        ids = {item_id for row in rows for item_id in row[column]}
+        if not ids:
+            return {}
+
+        return {
+            item_id: {'id': item_id, 'name': item_name}
+            for item_id, item_name in model.objects.filter(
+                id__in=ids).values_list('id', 'name')
+        }
+
+    def to_representation(self, data):
+        rows = list(data)
+        renderers = []
+        for name, field in self.child.fields.items():
+            if name in self.nested:
+                renderers.append((name, self.nested[name][0],
+                                  self._get_nested(rows, name)))
+            elif isinstance(field, serializers.DecimalField):
+                renderers.append((name, name, field.to_representation))
+            else:
+                renderers.append((name, name, None))
+
+        results = []
+        for row in rows:
+            item = {}
+            for name, column, render in renderers:
+                value = row[column]
+                if isinstance(render, dict):
+                    item[name] = [render[i] for i in value if i in render]
+                elif render is not None and value is not None:
+                    item[name] = render(value)
+                else:
+                    item[name] = value
+            results.append(item)
+
+        return results
+
+
 class RecipeDetailSerializer(RecipeSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta(RecipeSerializer.Meta):
-        fields = RecipeSerializer.Meta.fields + ['description', 'image']
+        fields = RecipeSerializer.Meta.fields + [
+            'description', 'image', 'image_status', 'image_variants']
+        read_only_fields = RecipeSerializer.Meta.read_only_fields + [
+            'image', 'image_status']
 
 
 class RecipeImageSerializer(serializers.ModelSerializer):
+    image = StreamedImageField(required=True)
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Recipe
-        fields = ['id', 'image']
-        read_only_fields = ['id']
-        extra_kwargs = {'image': {'required': 'True'}}
+        fields = ['id', 'image', 'image_status', 'image_variants']
+        read_only_fields = ['id', 'image_status']
+
+    def validate(self, attrs):
+        attrs['image_sha256'] = attrs['image'].sha256
+        return attrs
+
+
+class FacetSerializer(serializers.Serializer):
+    """Number of matching recipes with a tag or ingredient"""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class RecipeFacetsSerializer(serializers.Serializer):
+    """Recipe counts per tag and ingredient"""
+    tags = FacetSerializer(many=True)
+    ingredients = FacetSerializer(many=True)
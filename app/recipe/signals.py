@@ -0,0 +1,22 @@
+"""
+Signal handlers invalidating the per-user response cache
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.cache import invalidate_user
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_owner(sender, instance, **kwargs):
+    """Tags, ingredients and their recipes share an owner"""
+    if kwargs.get('action', 'post_').startswith('post_'):
+        invalidate_user(instance.user_id)
@@ -0,0 +1,28 @@
+"""
+Query budget helpers for recipe API tests
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """Assert that a block of code stays within a declared query count"""
+
+    @contextmanager
+    def assertQueryBudget(self, budget):
+        """Fail if the wrapped block runs more than `budget` queries"""
+        with CaptureQueriesContext(connection) as context:
+            yield context
+
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                f'{i}. {query["sql"]}'
+                for i, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(
+                f'{executed} queries executed, budget is {budget}:\n'
+                f'{queries}'
+            )
@@ -0,0 +1,148 @@
+"""
+Test the async read endpoints served by app.asgi
+"""
+import asyncio
+from decimal import Decimal
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import (
+    AsyncClient,
+    Client,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import resolve, reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core.models import Recipe, Tag, Ingredient
+
+from recipe.cache import response_cache
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+COMPARED_HEADERS = ('Content-Type', 'ETag', 'Vary', 'X-Cache', 'Allow')
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+@override_settings(ROOT_URLCONF='app.asgi_urls')
+class AsyncReadViewTests(TransactionTestCase):
+    """
+    Test the async read endpoints answer as the sync ones do. Pool threads
+    use their own connections, so the data has to be committed.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Lentil soup',
+            time_minutes=30,
+            price=Decimal('4.20'),
+        )
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        self.recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Lentils'))
+        Recipe.objects.create(
+            user=self.user,
+            title='Toast',
+            time_minutes=5,
+            price=Decimal('1.00'),
+        )
+
+    async def get_both(self, url, params=None, token=True, **headers):
+        """Return the async and then the sync response to the same GET"""
+        if token:
+            headers['Authorization'] = f'Token {self.token.key}'
+        if params:
+            # AsyncClient.get() does not encode `data` in Django 3.2
+            url = f'{url}?{urlencode(params)}'
+        response_cache().clear()
+        async_res = await AsyncClient().get(url, **headers)
+
+        response_cache().clear()
+        sync_headers = {
+            'HTTP_' + name.upper().replace('-', '_'): value
+            for name, value in headers.items()
+        }
+        sync_res = await sync_to_async(Client().get)(url, **sync_headers)
+
+        return async_res, sync_res
+
+    def assertSameResponse(self, async_res, sync_res):
+        self.assertEqual(async_res.status_code, sync_res.status_code)
+        self.assertEqual(async_res.content, sync_res.content)
+        for header in COMPARED_HEADERS:
+            self.assertEqual(async_res.get(header), sync_res.get(header),
+                             header)
+
+    async def test_same_responses(self):
+        for url, params in (
+            (RECIPES_URL, None),
+            (RECIPES_URL, {'ordering': 'price', 'page_size': 1}),
+            (RECIPES_URL, {'fields': 'id,title', 'search': 'soup'}),
+            (detail_url(self.recipe.id), None),
+            (detail_url(0), None),
+            (TAGS_URL, None),
+            (INGREDIENTS_URL, {'assigned_only': 1}),
+        ):
+            with self.subTest(url=url, params=params):
+                async_res, sync_res = await self.get_both(url, params)
+
+                self.assertLess(async_res.status_code, 500)
+                self.assertSameResponse(async_res, sync_res)
+
+    async def test_auth_required(self):
+        async_res, sync_res = await self.get_both(RECIPES_URL, token=False)
+
+        self.assertEqual(async_res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertSameResponse(async_res, sync_res)
+
+    async def test_invalid_token(self):
+        async_res, sync_res = await self.get_both(
+            TAGS_URL, token=False, Authorization='Token invalid')
+
+        self.assertEqual(async_res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertSameResponse(async_res, sync_res)
+
+    async def test_not_modified(self):
+        client = AsyncClient()
+        auth = {'Authorization': f'Token {self.token.key}'}
+        res = await client.get(RECIPES_URL, **auth)
+
+        again = await client.get(RECIPES_URL, **auth,
+                                 **{'If-None-Match': res['ETag']})
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_writes_still_served(self):
+        res = await AsyncClient().post(
+            RECIPES_URL,
+            {'title': 'Stew', 'time_minutes': 60, 'price': '7.00'},
+            content_type='application/json',
+            Authorization=f'Token {self.token.key}',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_read_views_async(self):
+        for url in (RECIPES_URL, detail_url(1), TAGS_URL, INGREDIENTS_URL):
+            with self.subTest(url=url):
+                view = resolve(url).func
+
+                self.assertTrue(asyncio.iscoroutinefunction(view))
+                self.assertTrue(view.csrf_exempt)
+                self.assertIn('get', view.actions)
@@ -0,0 +1,222 @@
+"""
+Test the bulk recipe API
+"""
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+
+from recipe.tests.query_budget import QueryBudgetMixin
+
+BULK_URL = reverse('recipe:recipe-bulk')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def recipe_payload(index, **params):
+    payload = {
+        'title': f'Recipe {index}',
+        'time_minutes': 10,
+        'price': '5.50',
+        'tags': [{'name': 'Dinner'}, {'name': f'Tag {index}'}],
+        'ingredients': [{'name': 'Salt'}],
+    }
+    payload.update(params)
+
+    return payload
+
+
+def create_recipe(user, **params):
+    defaults = {
+        'title': 'Test recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.50'),
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class BulkRecipeApiTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create(self):
+        payload = [recipe_payload(i) for i in range(3)]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([r['title'] for r in res.data],
+                         ['Recipe 0', 'Recipe 1', 'Recipe 2'])
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(Tag.objects.filter(name='Dinner').count(), 1)
+        self.assertEqual(Ingredient.objects.filter(user=self.user).count(), 1)
+        recipe = Recipe.objects.get(title='Recipe 1')
+        self.assertEqual(
+            sorted(recipe.tags.values_list('name', flat=True)),
+            ['Dinner', 'Tag 1'],
+        )
+        self.assertEqual(recipe.user, self.user)
+
+    def test_bulk_create_reuses_existing_tags(self):
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+
+        self.client.post(BULK_URL, [recipe_payload(0)], format='json')
+
+        self.assertIn(tag, Recipe.objects.get().tags.all())
+
+    def test_bulk_create_invalid_item_creates_nothing(self):
+        payload = [recipe_payload(0), recipe_payload(1, price='abc')]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('price', res.data[1])
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(Tag.objects.exists())
+
+    def test_bulk_requires_list(self):
+        res = self.client.post(BULK_URL, recipe_payload(0), format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(API_BULK_MAX_ITEMS=2)
+    def test_bulk_item_limit(self):
+        payload = [recipe_payload(i) for i in range(3)]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_update(self):
+        r1 = create_recipe(self.user, title='One')
+        r2 = create_recipe(self.user, title='Two')
+        r2.tags.add(Tag.objects.create(user=self.user, name='Lunch'))
+        payload = [
+            {'id': r1.id, 'title': 'First'},
+            {'id': r2.id, 'tags': [{'name': 'Dinner'}]},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        r1.refresh_from_db()
+        r2.refresh_from_db()
+        self.assertEqual(r1.title, 'First')
+        self.assertEqual(r2.title, 'Two')
+        self.assertEqual(list(r2.tags.values_list('name', flat=True)),
+                         ['Dinner'])
+        self.assertEqual(res.data[1]['tags'][0]['name'], 'Dinner')
+
+    def test_bulk_update_other_users_recipe(self):
+        other_user = get_user_model().objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='12345678',
+        )
+        mine = create_recipe(self.user, title='Mine')
+        theirs = create_recipe(other_user, title='Theirs')
+        payload = [
+            {'id': mine.id, 'title': 'Changed'},
+            {'id': theirs.id, 'title': 'Changed'},
+            {'title': 'No id'},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('id', res.data[1])
+        self.assertIn('id', res.data[2])
+        mine.refresh_from_db()
+        self.assertEqual(mine.title, 'Mine')
+
+    def test_bulk_update_repeated_id(self):
+        recipe = create_recipe(self.user, title='One')
+        payload = [
+            {'id': recipe.id, 'title': 'A', 'tags': [{'name': 'Lunch'}]},
+            {'id': recipe.id, 'title': 'B', 'tags': [{'name': 'Dinner'}]},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('id', res.data[1])
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, 'One')
+        self.assertFalse(recipe.tags.exists())
+
+    def test_bulk_delete(self):
+        r1 = create_recipe(self.user)
+        r2 = create_recipe(self.user)
+        r3 = create_recipe(self.user)
+
+        res = self.client.delete(BULK_URL, {'ids': [r1.id, r2.id]},
+                                 format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Recipe.objects.all()), [r3])
+
+    def test_bulk_delete_ignores_list_filters(self):
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        r1 = create_recipe(self.user)
+        r2 = create_recipe(self.user)
+        r2.tags.add(tag)
+
+        res = self.client.delete(f'{BULK_URL}?tags={tag.id}&search=x',
+                                 {'ids': [r1.id, r2.id]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_delete_missing_deletes_nothing(self):
+        recipe = create_recipe(self.user)
+
+        res = self.client.delete(BULK_URL, {'ids': [recipe.id, 0]},
+                                 format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
+
+    def test_bulk_delete_repeated_id(self):
+        recipe = create_recipe(self.user)
+
+        res = self.client.delete(BULK_URL, {'ids': [recipe.id, recipe.id]},
+                                 format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ids', res.data)
+        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
+
+    def test_bulk_create_visible_in_list(self):
+        self.client.get(RECIPES_URL)
+
+        self.client.post(BULK_URL, [recipe_payload(0)], format='json')
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data), 1)
+
+    def test_bulk_create_queries_do_not_grow(self):
+        with self.assertQueryBudget(20) as small:
+            self.client.post(BULK_URL, [recipe_payload(0)], format='json')
+
+        payload = [recipe_payload(i) for i in range(1, 50)]
+        with self.assertQueryBudget(len(small.captured_queries)):
+            res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
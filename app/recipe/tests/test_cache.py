@@ -0,0 +1,158 @@
+"""
+Test the per-user response cache of the recipe APIs
+"""
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+
+from recipe.cache import response_cache, response_cache_stats
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_user(username='user'):
+    return get_user_model().objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='12345678',
+    )
+
+
+def create_recipe(user, **params):
+    defaults = {
+        'title': 'Test recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.50'),
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        response_cache().clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.recipe.tags.add(self.tag)
+
+    def assertCached(self, url, params=None):
+        res = self.client.get(url, params)
+        self.assertEqual(res['X-Cache'], 'HIT')
+        return res
+
+    def assertNotCached(self, url, params=None):
+        res = self.client.get(url, params)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        return res
+
+    def test_second_read_served_from_cache(self):
+        for url in (RECIPES_URL, detail_url(self.recipe.id), TAGS_URL,
+                    INGREDIENTS_URL):
+            first = self.assertNotCached(url)
+            # Only the ETag version query runs on a hit
+            with self.assertNumQueries(1):
+                second = self.assertCached(url)
+
+            self.assertEqual(second.status_code, status.HTTP_200_OK)
+            self.assertEqual(second.data, first.data)
+
+    def test_keyed_on_query_params(self):
+        self.assertNotCached(RECIPES_URL)
+        self.assertNotCached(RECIPES_URL, {'tags': self.tag.id})
+        self.assertNotCached(TAGS_URL, {'assigned_only': 1})
+        self.assertCached(TAGS_URL, {'assigned_only': 1})
+
+    def test_invalidated_on_write(self):
+        self.assertNotCached(RECIPES_URL)
+
+        res = self.client.patch(detail_url(self.recipe.id),
+                                {'title': 'New title'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.assertNotCached(RECIPES_URL)
+        self.assertEqual(res.data[0]['title'], 'New title')
+
+    def test_invalidated_across_workers(self):
+        """Test a write in one worker invalidates another's cached data"""
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        worker1, worker2 = (FileBasedCache(location.name, {})
+                            for _ in range(2))
+        with patch('recipe.cache.response_cache', return_value=worker1):
+            self.assertNotCached(RECIPES_URL)
+            self.assertCached(RECIPES_URL)
+        with patch('recipe.cache.response_cache', return_value=worker2):
+            self.client.patch(detail_url(self.recipe.id),
+                              {'title': 'New title'})
+
+        with patch('recipe.cache.response_cache', return_value=worker1):
+            res = self.assertNotCached(RECIPES_URL)
+        self.assertEqual(res.data[0]['title'], 'New title')
+
+    def test_invalidated_on_links_changed(self):
+        self.assertNotCached(RECIPES_URL)
+
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        self.assertNotCached(RECIPES_URL)
+        self.recipe.ingredients.add(ingredient)
+
+        res = self.assertNotCached(RECIPES_URL)
+        self.assertEqual(res.data[0]['ingredients'][0]['name'], 'Salt')
+
+    def test_invalidated_on_delete(self):
+        self.assertNotCached(TAGS_URL)
+
+        self.tag.delete()
+
+        res = self.assertNotCached(TAGS_URL)
+        self.assertEqual(res.data, [])
+
+    def test_cache_per_user(self):
+        self.assertNotCached(RECIPES_URL)
+        other_user = create_user('other')
+        self.client.force_authenticate(other_user)
+
+        res = self.assertNotCached(RECIPES_URL)
+        self.assertEqual(res.data, [])
+
+    def test_errors_not_cached(self):
+        url = detail_url(self.recipe.id + 1)
+        self.client.get(url)
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response_cache_stats(), {'hits': 0, 'misses': 2})
+
+    def test_stats(self):
+        self.client.get(RECIPES_URL)
+        self.client.get(RECIPES_URL)
+        self.client.get(TAGS_URL)
+
+        self.assertEqual(response_cache_stats(), {'hits': 1, 'misses': 2})
+
+        out = StringIO()
+        call_command('response_cache_stats', stdout=out)
+        self.assertIn('hit ratio: 33.33%', out.getvalue())
@@ -0,0 +1,135 @@
+"""
+Test ETag and conditional GET support of the recipe APIs
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_recipe(user, **params):
+    defaults = {
+        'title': 'Test recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.50'),
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.recipe.tags.add(self.tag)
+
+    def assertNotModified(self, url, etag):
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def assertModified(self, url, etag):
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_and_detail_have_validators(self):
+        for url in (RECIPES_URL, detail_url(self.recipe.id), TAGS_URL,
+                    INGREDIENTS_URL):
+            res = self.client.get(url)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertTrue(res['ETag'].startswith('"'))
+            self.assertIn('Last-Modified', res)
+
+    def test_list_not_modified_skips_serialization(self):
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertEqual(res.content, b'')
+
+    def test_detail_not_modified(self):
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        self.assertNotModified(url, etag)
+
+    def test_etag_varies_with_query_params(self):
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        self.assertModified(f'{RECIPES_URL}?tags={self.tag.id}', etag)
+
+    def test_etag_changes_on_recipe_update(self):
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        self.client.patch(url, {'title': 'New title'})
+
+        self.assertModified(url, etag)
+
+    def test_etag_changes_on_tag_rename(self):
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        self.tag.name = 'Vegetarian'
+        self.tag.save()
+
+        self.assertModified(url, etag)
+
+    def test_etag_changes_on_links_changed(self):
+        url = detail_url(self.recipe.id)
+        list_etag = self.client.get(TAGS_URL, {'assigned_only': 1})['ETag']
+        etag = self.client.get(url)['ETag']
+
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        ingredient.recipe_set.add(self.recipe)
+
+        self.assertModified(url, etag)
+        etag = self.client.get(url)['ETag']
+        self.tag.recipe_set.clear()
+
+        self.assertModified(url, etag)
+        self.assertModified(f'{TAGS_URL}?assigned_only=1', list_etag)
+
+    def test_etag_changes_on_delete(self):
+        other = create_recipe(self.user, title='Other')
+        etag = self.client.get(RECIPES_URL)['ETag']
+
+        other.delete()
+
+        self.assertModified(RECIPES_URL, etag)
+
+    def test_etag_differs_per_user(self):
+        etag = self.client.get(RECIPES_URL)['ETag']
+        other_user = get_user_model().objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='12345678',
+        )
+        self.client.force_authenticate(other_user)
+
+        self.assertModified(RECIPES_URL, etag)
@@ -0,0 +1,113 @@
+"""
+Test the recipe facets API
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+
+from recipe.tests.query_budget import QueryBudgetMixin
+
+FACETS_URL = reverse('recipe:recipe-facets')
+
+
+def create_recipe(user, **params):
+    defaults = {
+        'title': 'Test recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.50'),
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class RecipeFacetsApiTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.client.force_authenticate(self.user)
+
+        self.vegan = Tag.objects.create(user=self.user, name='Vegan')
+        self.dinner = Tag.objects.create(user=self.user, name='Dinner')
+        self.salt = Ingredient.objects.create(user=self.user, name='Salt')
+        self.r1 = create_recipe(self.user, title='Lentil soup')
+        self.r1.tags.add(self.vegan, self.dinner)
+        self.r1.ingredients.add(self.salt)
+        self.r2 = create_recipe(self.user, title='Steak')
+        self.r2.tags.add(self.dinner)
+        create_recipe(self.user, title='Toast')
+
+    def test_facets(self):
+        res = self.client.get(FACETS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'tags': [
+                {'id': self.dinner.id, 'name': 'Dinner', 'count': 2},
+                {'id': self.vegan.id, 'name': 'Vegan', 'count': 1},
+            ],
+            'ingredients': [
+                {'id': self.salt.id, 'name': 'Salt', 'count': 1},
+            ],
+        })
+
+    def test_facets_follow_filters(self):
+        res = self.client.get(FACETS_URL, {'tags': str(self.vegan.id)})
+
+        self.assertEqual([t['count'] for t in res.data['tags']], [1, 1])
+
+    def test_facets_follow_search(self):
+        res = self.client.get(FACETS_URL, {'search': 'steak'})
+
+        self.assertEqual(res.data['tags'], [
+            {'id': self.dinner.id, 'name': 'Dinner', 'count': 1},
+        ])
+        self.assertEqual(res.data['ingredients'], [])
+
+    def test_facets_limited_to_user(self):
+        other_user = get_user_model().objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='12345678',
+        )
+        recipe = create_recipe(other_user)
+        recipe.tags.add(Tag.objects.create(user=other_user, name='Lunch'))
+
+        res = self.client.get(FACETS_URL)
+
+        self.assertNotIn('Lunch', [t['name'] for t in res.data['tags']])
+
+    def test_facets_single_query(self):
+        """Test facets take one query besides the version lookup."""
+        with self.assertQueryBudget(2):
+            self.client.get(FACETS_URL)
+
+    def test_facets_cached_until_change(self):
+        self.client.get(FACETS_URL)
+
+        cached = self.client.get(FACETS_URL)
+        self.r2.tags.add(self.vegan)
+        changed = self.client.get(FACETS_URL)
+
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(changed['X-Cache'], 'MISS')
+        self.assertEqual(changed.data['tags'][0]['count'], 2)
+        self.assertEqual(changed.data['tags'][1]['count'], 2)
+
+    def test_facets_not_modified(self):
+        res = self.client.get(FACETS_URL)
+
+        again = self.client.get(FACETS_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
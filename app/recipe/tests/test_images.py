@@ -0,0 +1,165 @@
+"""
+Test background processing of uploaded recipe images
+"""
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+import tempfile
+
+from PIL import Image
+
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+
+from recipe.images import IMAGE_VARIANTS, _store_result
+
+
+def image_upload_url(recipe_id):
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+@override_settings(IMAGE_PROCESSING_WORKERS=0)
+class ImageProcessingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Test recipe',
+            time_minutes=10,
+            price=Decimal('5.50'),
+        )
+
+    def tearDown(self):
+        self.recipe.refresh_from_db()
+        for files in self.recipe.image_variants.values():
+            for name in files.values():
+                default_storage.delete(name)
+        self.recipe.image.delete()
+
+    def upload(self, size=(2000, 1000), exif=None):
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
+            img = Image.new('RGB', size)
+            img.save(image_file, format='JPEG', exif=exif or b'')
+            image_file.seek(0)
+            with self.captureOnCommitCallbacks(execute=True):
+                return self.client.post(
+                    image_upload_url(self.recipe.id),
+                    {'image': image_file},
+                    format='multipart',
+                )
+
+    def test_upload_returns_pending(self):
+        with patch('recipe.images._submit'):
+            res = self.upload()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['image_status'], 'pending')
+        self.assertEqual(res.data['image_variants'], {})
+
+    def test_variants_created(self):
+        self.upload()
+        self.recipe.refresh_from_db()
+
+        self.assertEqual(self.recipe.image_status, 'ready')
+        self.assertEqual(set(self.recipe.image_variants), set(IMAGE_VARIANTS))
+        for variant, size in IMAGE_VARIANTS.items():
+            name = self.recipe.image_variants[variant]['jpg']
+            with default_storage.open(name) as f:
+                img = Image.open(f)
+                self.assertEqual(max(img.size), size)
+                self.assertIn('progressive', img.info)
+
+    def test_variants_strip_exif(self):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera maker'
+        self.upload(exif=exif.tobytes())
+        self.recipe.refresh_from_db()
+
+        name = self.recipe.image_variants['large']['jpg']
+        with default_storage.open(name) as f:
+            self.assertNotIn('exif', Image.open(f).info)
+
+    def test_variant_urls_in_detail(self):
+        self.upload()
+
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(res.data['image_status'], 'ready')
+        url = res.data['image_variants']['thumbnail']['jpg']
+        self.assertTrue(url.startswith('http://testserver/'))
+
+    @patch('recipe.images.process_image', side_effect=OSError)
+    def test_processing_failure(self, patched_process):
+        with self.assertLogs('recipe.images', 'ERROR'):
+            self.upload()
+        self.recipe.refresh_from_db()
+
+        self.assertEqual(self.recipe.image_status, 'failed')
+        self.assertEqual(self.recipe.image_variants, {})
+
+    def test_stale_result_ignored(self):
+        """Test results for a replaced image are dropped"""
+        with patch('recipe.images._submit'):
+            self.upload()
+
+        _store_result(self.recipe.id, 'uploads/recipe/old.jpg',
+                      {'small': {'jpg': 'uploads/recipe/old_small.jpg'}})
+        self.recipe.refresh_from_db()
+
+        self.assertEqual(self.recipe.image_status, 'pending')
+        self.assertEqual(self.recipe.image_variants, {})
+
+    def test_replaced_variants_deleted(self):
+        """Test variants of a replaced image are deleted once stored"""
+        self.upload()
+        self.recipe.refresh_from_db()
+        old = self.recipe.image_variants['small']['jpg']
+
+        with patch('recipe.images._submit'):
+            self.upload(size=(1000, 500))
+        self.assertTrue(default_storage.exists(old))
+
+        self.upload(size=(800, 400))
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, 'ready')
+        self.assertNotEqual(self.recipe.image_variants['small']['jpg'], old)
+        self.assertFalse(default_storage.exists(old))
+
+    def test_requeue_pending(self):
+        with patch('recipe.images._submit'):
+            self.upload()
+        out = StringIO()
+
+        call_command('requeue_image_processing', '--min-age', '0',
+                     stdout=out)
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, 'ready')
+        self.assertIn('Processed 1 pending images.', out.getvalue())
+
+    def test_requeue_skips_recent(self):
+        with patch('recipe.images._submit'):
+            self.upload()
+
+        call_command('requeue_image_processing', stdout=StringIO())
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, 'pending')
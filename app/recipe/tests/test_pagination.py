@@ -0,0 +1,148 @@
+"""
+Test cursor pagination of the recipe, tag and ingredient list APIs
+"""
+from base64 import b64encode
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+
+from recipe.pagination import OptInCursorPagination
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def create_recipe(user, index, price=Decimal('5.50')):
+    return Recipe.objects.create(
+        user=user,
+        title=f'Recipe {index}',
+        time_minutes=10,
+        price=price,
+    )
+
+
+def collect_pages(client, url, page_size, **params):
+    """Follow `next` links and return every page"""
+    pages = []
+    res = client.get(url, {'page_size': page_size, **params})
+    while True:
+        pages.append(res.data)
+        if not res.data['next']:
+            return pages
+        res = client.get(res.data['next'])
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_unpaginated_by_default(self):
+        for i in range(3):
+            create_recipe(self.user, i)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(res.data, list)
+        self.assertEqual(len(res.data), 3)
+
+    def test_recipes_paginated_by_id(self):
+        recipes = [create_recipe(self.user, i) for i in range(5)]
+
+        pages = collect_pages(self.client, RECIPES_URL, 2)
+
+        ids = [item['id'] for page in pages for item in page['results']]
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(ids, [r.id for r in reversed(recipes)])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_search_results_paginated(self):
+        recipes = [create_recipe(self.user, i) for i in range(5)]
+        Recipe.objects.create(user=self.user, title='Soup', time_minutes=5,
+                              price=Decimal('1.00'))
+
+        pages = collect_pages(self.client, RECIPES_URL, 2, search='recipe')
+
+        ids = [item['id'] for page in pages for item in page['results']]
+        self.assertEqual(sorted(ids), sorted(r.id for r in recipes))
+
+    def test_previous_link_returns_prior_page(self):
+        for i in range(4):
+            create_recipe(self.user, i)
+
+        first = self.client.get(RECIPES_URL, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_recipes_paginated_by_price_with_ties(self):
+        """Test every recipe is listed once when many share a price."""
+        prices = ['3.00', '1.00', '3.00', '2.00', '3.00', '3.00', '1.00']
+        recipes = [create_recipe(self.user, i, Decimal(price))
+                   for i, price in enumerate(prices)]
+
+        pages = collect_pages(self.client, RECIPES_URL, 2,
+                              ordering='-price')
+
+        ids = [item['id'] for page in pages for item in page['results']]
+        expected = sorted(recipes, key=lambda r: (r.price, r.id),
+                          reverse=True)
+        self.assertEqual(ids, [r.id for r in expected])
+
+    def test_previous_link_with_price_ordering(self):
+        for i, price in enumerate(['2.00', '1.00', '2.00', '1.00', '2.00']):
+            create_recipe(self.user, i, Decimal(price))
+
+        first = self.client.get(RECIPES_URL,
+                                {'page_size': 2, 'ordering': 'price'})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_tampered_cursor_returns_404(self):
+        cursor = b64encode(b'p=%5B%22x%22%5D').decode()
+
+        res = self.client.get(RECIPES_URL, {'cursor': cursor})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tags_paginated_by_name_then_id(self):
+        Tag.objects.create(user=self.user, name='Breakfast')
+        Tag.objects.create(user=self.user, name='Vegan')
+        Tag.objects.create(user=self.user, name='Dessert')
+
+        pages = collect_pages(self.client, TAGS_URL, 2)
+
+        names = [item['name'] for page in pages for item in page['results']]
+        self.assertEqual(names, ['Vegan', 'Dessert', 'Breakfast'])
+
+    def test_page_size_capped(self):
+        for i in range(3):
+            create_recipe(self.user, i)
+
+        with patch.object(OptInCursorPagination, 'max_page_size', 2):
+            res = self.client.get(RECIPES_URL, {'page_size': 100})
+
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNotNone(res.data['next'])
+
+    def test_invalid_cursor_returns_404(self):
+        res = self.client.get(RECIPES_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
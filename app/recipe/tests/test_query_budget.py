@@ -0,0 +1,185 @@
+"""
+Test the number of queries run by the recipe APIs
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+
+from recipe.tests.query_budget import QueryBudgetMixin
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+# Maximum number of queries each view may run, independent of data size.
+QUERY_BUDGETS = {
+    'recipe-list': 4,
+    'recipe-list-sparse': 2,
+    'recipe-detail': 4,
+    'recipe-create': 15,
+    'recipe-partial-update': 6,
+    'recipe-tags-update': 14,
+    'tag-list': 2,
+    'ingredient-list': 2,
+}
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_recipe(user, index, tag_count=3, ingredient_count=3):
+    recipe = Recipe.objects.create(
+        user=user,
+        title=f'Recipe {index}',
+        time_minutes=10,
+        price=Decimal('5.50'),
+    )
+    for i in range(tag_count):
+        tag = Tag.objects.create(user=user, name=f'Tag {index}-{i}')
+        recipe.tags.add(tag)
+    for i in range(ingredient_count):
+        ingredient = Ingredient.objects.create(
+            user=user, name=f'Ingredient {index}-{i}')
+        recipe.ingredients.add(ingredient)
+
+    return recipe
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_recipe_list_within_budget(self):
+        for i in range(20):
+            create_recipe(self.user, i)
+
+        with self.assertQueryBudget(QUERY_BUDGETS['recipe-list']):
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 20)
+        self.assertEqual(len(res.data[0]['tags']), 3)
+        self.assertEqual(len(res.data[0]['ingredients']), 3)
+
+    def test_sparse_recipe_list_skips_prefetch(self):
+        for i in range(20):
+            create_recipe(self.user, i)
+
+        params = {'fields': 'id,title', 'ordering': 'price', 'page_size': 5}
+        with self.assertQueryBudget(QUERY_BUDGETS['recipe-list-sparse']):
+            res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 5)
+        self.assertEqual(set(res.data['results'][0]), {'id', 'title'})
+
+    def test_recipe_list_queries_do_not_grow(self):
+        create_recipe(self.user, 0)
+        with self.assertQueryBudget(QUERY_BUDGETS['recipe-list']) as small:
+            self.client.get(RECIPES_URL)
+
+        for i in range(1, 10):
+            create_recipe(self.user, i)
+        with self.assertQueryBudget(QUERY_BUDGETS['recipe-list']) as large:
+            self.client.get(RECIPES_URL)
+
+        self.assertEqual(
+            len(small.captured_queries),
+            len(large.captured_queries),
+        )
+
+    def test_recipe_detail_within_budget(self):
+        recipe = create_recipe(self.user, 0, tag_count=10,
+                               ingredient_count=10)
+
+        with self.assertQueryBudget(QUERY_BUDGETS['recipe-detail']):
+            res = self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tags']), 10)
+
+    def test_recipe_create_within_budget(self):
+        Ingredient.objects.create(user=self.user, name='Ingredient 0')
+        payload = {
+            'title': 'Recipe',
+            'time_minutes': 10,
+            'price': Decimal('5.50'),
+            'tags': [{'name': f'Tag {i}'} for i in range(10)],
+            'ingredients': [{'name': f'Ingredient {i}'} for i in range(30)],
+        }
+
+        with self.assertQueryBudget(QUERY_BUDGETS['recipe-create']):
+            res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data['tags']), 10)
+        self.assertEqual(len(res.data['ingredients']), 30)
+
+    def test_recipe_partial_update_within_budget(self):
+        recipe = create_recipe(self.user, 0, tag_count=10,
+                               ingredient_count=10)
+
+        with self.assertQueryBudget(
+                QUERY_BUDGETS['recipe-partial-update']) as context:
+            res = self.client.patch(detail_url(recipe.id),
+                                    {'title': 'New title'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tags']), 10)
+        sql = ' '.join(q['sql'] for q in context.captured_queries)
+        self.assertNotIn('DELETE', sql)
+        self.assertNotIn('"time_minutes" =', sql)
+
+    def test_recipe_tags_update_within_budget(self):
+        recipe = create_recipe(self.user, 0, tag_count=10)
+        names = [tag.name for tag in recipe.tags.all()][1:] + ['New tag']
+
+        with self.assertQueryBudget(QUERY_BUDGETS['recipe-tags-update']):
+            res = self.client.patch(
+                detail_url(recipe.id),
+                {'tags': [{'name': name} for name in names]},
+                format='json',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(tag['name'] for tag in res.data['tags']),
+            sorted(names),
+        )
+
+    def test_tag_list_within_budget(self):
+        for i in range(5):
+            create_recipe(self.user, i)
+
+        with self.assertQueryBudget(QUERY_BUDGETS['tag-list']):
+            res = self.client.get(TAGS_URL, {'assigned_only': 1})
+
+        self.assertEqual(len(res.data), 15)
+
+    def test_ingredient_list_within_budget(self):
+        for i in range(5):
+            create_recipe(self.user, i)
+
+        with self.assertQueryBudget(QUERY_BUDGETS['ingredient-list']):
+            res = self.client.get(INGREDIENTS_URL)
+
+        self.assertEqual(len(res.data), 15)
+
+    def test_budget_exceeded_fails(self):
+        with self.assertRaises(AssertionError):
+            with self.assertQueryBudget(0):
+                Recipe.objects.count()
@@ -0,0 +1,111 @@
+"""
+Test that the recipe API list queries are served by an index
+"""
+from decimal import Decimal
+
+from django.contrib.postgres.search import SearchQuery
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Value
+
+from core.models import SEARCH_CONFIG, Recipe, Tag, Ingredient
+
+from recipe.pagination import Row
+
+USER_COUNT = 5
+ROWS_PER_USER = 200
+PAGE_SIZE = 50
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = [
+            get_user_model().objects.create_user(
+                username=f'user{i}',
+                email=f'user{i}@example.com',
+                password='12345678',
+            )
+            for i in range(USER_COUNT)
+        ]
+        for user in users:
+            Recipe.objects.bulk_create([
+                Recipe(user=user, title=f'Recipe {i}', time_minutes=10,
+                       price=Decimal('5.50'))
+                for i in range(ROWS_PER_USER)
+            ])
+            Tag.objects.bulk_create([
+                Tag(user=user, name=f'Tag {i}')
+                for i in range(ROWS_PER_USER)
+            ])
+            Ingredient.objects.bulk_create([
+                Ingredient(user=user, name=f'Ingredient {i}')
+                for i in range(ROWS_PER_USER)
+            ])
+        cls.user = users[0]
+
+        tags = list(Tag.objects.filter(user=cls.user)[:10])
+        ingredients = list(Ingredient.objects.filter(user=cls.user)[:10])
+        for recipe in Recipe.objects.filter(user=cls.user)[:50]:
+            recipe.tags.add(*tags)
+            recipe.ingredients.add(*ingredients)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        # Small tables are cheaper to scan sequentially; this asks
+        # whether an index can serve the query at all.
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(index, plan)
+
+    def test_recipe_list_uses_index(self):
+        queryset = Recipe.objects.filter(
+            user=self.user).order_by('-id')[:PAGE_SIZE]
+
+        self.assertUsesIndex(queryset, 'core_recipe_user_id_desc_idx')
+
+    def test_tag_list_uses_index(self):
+        queryset = Tag.objects.filter(
+            user=self.user).order_by('-name', '-id')[:PAGE_SIZE]
+
+        self.assertUsesIndex(queryset, 'unique_tag_name_per_user')
+
+    def test_ingredient_list_uses_index(self):
+        queryset = Ingredient.objects.filter(
+            user=self.user).order_by('-name', '-id')[:PAGE_SIZE]
+
+        self.assertUsesIndex(queryset, 'unique_ingredient_name_per_user')
+
+    def test_recipe_search_uses_gin_index(self):
+        query = SearchQuery('recipe', config=SEARCH_CONFIG)
+        plan = Recipe.objects.filter(search_vector=query).explain()
+
+        self.assertIn('core_recipe_search_vector_idx', plan)
+
+    def test_tag_autocomplete_uses_trigram_index(self):
+        queryset = Tag.objects.filter(name__istartswith='tag')
+
+        self.assertIn('core_tag_name_trgm_idx', queryset.explain())
+
+    def test_recipe_all_tags_filter_uses_gin_index(self):
+        tag_ids = list(Tag.objects.filter(
+            user=self.user).values_list('id', flat=True)[:3])
+        queryset = Recipe.objects.filter(tag_ids__contains=tag_ids)
+
+        self.assertIn('core_recipe_tag_ids_gin_idx', queryset.explain())
+
+    def test_recipe_price_page_uses_index(self):
+        recipe = Recipe.objects.filter(user=self.user).first()
+        queryset = Recipe.objects.filter(
+            user=self.user, price__lte=Decimal('10.00'),
+        ).alias(cursor_row=Row('price', 'id')).filter(
+            cursor_row__gt=Row(Value(recipe.price), Value(recipe.id)),
+        ).order_by('price', 'id')[:50]
+
+        self.assertIn('core_recipe_user_price_idx', queryset.explain())
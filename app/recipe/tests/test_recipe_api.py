@@ -17,6 +17,7 @@ from rest_framework.test import APIClient
 
 from core.models import Recipe, Tag, Ingredient
 
+from recipe.cache import response_cache
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 
 RECIPES_URL = reverse('recipe:recipe-list')
@@ -60,6 +61,8 @@ class PublicRecipeApiTests(TestCase):
 
 class PrivateRecipeApiTests(TestCase):
     def setUp(self) -> None:
+        # User ids repeat between tests, so earlier responses could match
+        response_cache().clear()
         self.client = APIClient()
         self.user = create_user(
             username='username',
@@ -245,6 +248,21 @@ class PrivateRecipeApiTests(TestCase):
             ).exists()
             self.assertTrue(exists)
 
+    def test_create_recipe_with_repeated_tags(self):
+        Tag.objects.create(user=self.user, name='Indian')
+        payload = {
+            'title': 'Test recipe',
+            'time_minutes': 10,
+            'price': Decimal('5.50'),
+            'tags': [{'name': 'Indian'}, {'name': 'Thai'}, {'name': 'Thai'}]
+        }
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(id=res.data['id'])
+        self.assertEqual(recipe.tags.count(), 2)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
     def test_create_tag_on_update(self):
         recipe = create_recipe(self.user)
 
@@ -275,6 +293,17 @@ class PrivateRecipeApiTests(TestCase):
         self.assertIn(tag_lunch, recipe.tags.all())
         self.assertNotIn(tag_breakfast, recipe.tags.all())
 
+    def test_partial_update_keeps_tags(self):
+        tag_breakfast = Tag.objects.create(user=self.user, name='Breakfast')
+        recipe = create_recipe(self.user)
+        recipe.tags.add(tag_breakfast)
+
+        url = detail_url(recipe.id)
+        res = self.client.patch(url, {'title': 'New title'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(recipe.tags.all()), [tag_breakfast])
+
     def test_clear_recipe_tags(self):
         tag_breakfast = Tag.objects.create(user=self.user, name='Breakfast')
         recipe = create_recipe(self.user)
@@ -419,6 +448,206 @@ class PrivateRecipeApiTests(TestCase):
         self.assertIn(s2.data, res.data)
         self.assertNotIn(s3.data, res.data)
 
+    def test_search(self):
+        """Test searching recipe titles and descriptions."""
+        r1 = create_recipe(user=self.user, title='Lentil soup',
+                           description='Warming')
+        r2 = create_recipe(user=self.user, title='Stew',
+                           description='Thick soup of lentils')
+        create_recipe(user=self.user, title='Fish and chips',
+                      description='Fried')
+
+        res = self.client.get(RECIPES_URL, {'search': 'soup'})
+
+        self.assertEqual({r['id'] for r in res.data}, {r1.id, r2.id})
+
+    def test_search_with_tags(self):
+        """Test search combines with the tag filter."""
+        r1 = create_recipe(user=self.user, title='Vegan soup')
+        r2 = create_recipe(user=self.user, title='Chicken soup')
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        r1.tags.add(tag)
+
+        res = self.client.get(RECIPES_URL,
+                              {'search': 'soup', 'tags': str(tag.id)})
+
+        self.assertEqual([r['id'] for r in res.data], [r1.id])
+        self.assertNotIn(r2.id, [r['id'] for r in res.data])
+
+    def test_search_limited_to_user(self):
+        other_user = create_user(username='other', email='other@example.com',
+                                 password='test123')
+        create_recipe(user=other_user, title='Soup')
+
+        res = self.client.get(RECIPES_URL, {'search': 'soup'})
+
+        self.assertEqual(res.data, [])
+
+    def test_search_ranks_title_matches_first(self):
+        """Test title matches outrank description matches."""
+        in_description = create_recipe(user=self.user, title='Stew',
+                                       description='A lentil stew')
+        in_title = create_recipe(user=self.user, title='Lentil bake',
+                                 description='Baked')
+        create_recipe(user=self.user, title='Fish', description='Fried')
+
+        res = self.client.get(RECIPES_URL, {'search': 'lentils'})
+
+        self.assertEqual([r['id'] for r in res.data],
+                         [in_title.id, in_description.id])
+
+    def test_search_vector_follows_updates(self):
+        recipe = create_recipe(user=self.user, title='Stew')
+        Recipe.objects.filter(id=recipe.id).update(title='Curry')
+
+        res = self.client.get(RECIPES_URL, {'search': 'curry'})
+
+        self.assertEqual([r['id'] for r in res.data], [recipe.id])
+
+    def test_filter_by_price_and_time(self):
+        r1 = create_recipe(user=self.user, price=Decimal('4.00'),
+                           time_minutes=10)
+        create_recipe(user=self.user, price=Decimal('2.00'), time_minutes=10)
+        create_recipe(user=self.user, price=Decimal('9.00'), time_minutes=10)
+        create_recipe(user=self.user, price=Decimal('4.00'), time_minutes=60)
+
+        res = self.client.get(RECIPES_URL, {
+            'price_min': '3', 'price_max': '5.00', 'time_max': 30,
+        })
+
+        self.assertEqual([r['id'] for r in res.data], [r1.id])
+
+    def test_filter_invalid_number(self):
+        for params in ({'price_min': 'abc'}, {'price_max': 'nan'},
+                       {'time_max': '1.5'}):
+            res = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), res.data)
+
+    def test_filter_by_bigint_id(self):
+        create_recipe(user=self.user)
+
+        for params in ({'tags': '3000000000'},
+                       {'ingredients': '3000000000', 'match': 'all'}):
+            res = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.data, [])
+
+    def test_ordering(self):
+        cheap = create_recipe(user=self.user, price=Decimal('1.00'),
+                              time_minutes=50)
+        dear = create_recipe(user=self.user, price=Decimal('8.00'),
+                             time_minutes=5)
+        mid = create_recipe(user=self.user, price=Decimal('4.00'),
+                            time_minutes=20)
+
+        by_price = self.client.get(RECIPES_URL, {'ordering': 'price'})
+        by_time = self.client.get(RECIPES_URL, {'ordering': '-time_minutes'})
+
+        self.assertEqual([r['id'] for r in by_price.data],
+                         [cheap.id, mid.id, dear.id])
+        self.assertEqual([r['id'] for r in by_time.data],
+                         [cheap.id, mid.id, dear.id])
+
+    def test_invalid_ordering(self):
+        res = self.client.get(RECIPES_URL, {'ordering': 'title'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', res.data)
+
+    def test_sparse_fields_list(self):
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+        res = self.client.get(RECIPES_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.data, [{'id': recipe.id, 'title': recipe.title}])
+
+    def test_sparse_fields_expand(self):
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        recipe.tags.add(tag)
+
+        res = self.client.get(RECIPES_URL,
+                              {'fields': 'title', 'expand': 'tags'})
+
+        self.assertEqual(res.data, [{
+            'title': recipe.title,
+            'tags': [{'id': tag.id, 'name': 'Vegan'}],
+        }])
+
+    def test_sparse_fields_detail(self):
+        recipe = create_recipe(user=self.user)
+
+        res = self.client.get(detail_url(recipe.id),
+                              {'fields': 'description,link'})
+
+        self.assertEqual(res.data, {
+            'description': recipe.description,
+            'link': recipe.link,
+        })
+
+    def test_sparse_fields_unknown(self):
+        res = self.client.get(RECIPES_URL, {'fields': 'id,secret'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+    def test_filter_returns_each_recipe_once(self):
+        """Test a recipe matching several tags is listed once."""
+        recipe = create_recipe(user=self.user)
+        tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        tag2 = Tag.objects.create(user=self.user, name='Vegetarian')
+        recipe.tags.add(tag1, tag2)
+
+        params = {'tags': f'{tag1.id},{tag2.id}'}
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual([r['id'] for r in res.data], [recipe.id])
+
+    def test_filter_by_all_tags(self):
+        """Test match=all returns recipes having every tag."""
+        r1 = create_recipe(user=self.user, title='Vegan Curry')
+        r2 = create_recipe(user=self.user, title='Vegetable Soup')
+        tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        tag2 = Tag.objects.create(user=self.user, name='Dinner')
+        tag3 = Tag.objects.create(user=self.user, name='Spicy')
+        r1.tags.add(tag1, tag2, tag3)
+        r2.tags.add(tag1)
+
+        params = {'tags': f'{tag1.id},{tag2.id},{tag2.id}', 'match': 'all'}
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual([r['id'] for r in res.data], [r1.id])
+
+    def test_filter_by_all_tags_and_ingredients(self):
+        """Test match=all applies to tags and ingredients together."""
+        r1 = create_recipe(user=self.user, title='Chicken Curry')
+        r2 = create_recipe(user=self.user, title='Chicken Salad')
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        in1 = Ingredient.objects.create(user=self.user, name='Chicken')
+        in2 = Ingredient.objects.create(user=self.user, name='Curry')
+        r1.tags.add(tag)
+        r1.ingredients.add(in1, in2)
+        r2.tags.add(tag)
+        r2.ingredients.add(in1)
+
+        params = {
+            'tags': f'{tag.id}',
+            'ingredients': f'{in1.id},{in2.id}',
+            'match': 'all',
+        }
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual([r['id'] for r in res.data], [r1.id])
+
+    def test_filter_invalid_match(self):
+        res = self.client.get(RECIPES_URL, {'match': 'some'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class ImageUploadTest(TestCase):
 
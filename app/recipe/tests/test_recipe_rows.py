@@ -0,0 +1,121 @@
+"""
+Test the values() row serializer matches RecipeSerializer
+"""
+import random
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+
+from recipe.serializers import RecipeSerializer, RecipeRowListSerializer
+from recipe.views import (
+    NESTED_FIELDS,
+    RECIPE_ORDERINGS,
+    nested_prefetches,
+)
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+TITLES = ['Soup', 'Crème brûlée', 'Pad "thai"', 'Back\\slash', '日本料理', '']
+
+
+def create_recipes(user, count, seed=0):
+    """Create `count` recipes with random fields, tags and ingredients"""
+    rng = random.Random(seed)
+    tags = [Tag.objects.create(user=user, name=f'Tag {i}') for i in range(8)]
+    ingredients = [
+        Ingredient.objects.create(user=user, name=f'Ingredient {i} é')
+        for i in range(8)
+    ]
+    for i in range(count):
+        recipe = Recipe.objects.create(
+            user=user,
+            title=f'{rng.choice(TITLES)} {i}',
+            time_minutes=rng.randint(0, 500),
+            price=Decimal(rng.randint(0, 99999)) / 100,
+            link=rng.choice(['', 'https://example.com/recipe?a=1&b=2']),
+        )
+        recipe.tags.set(rng.sample(tags, rng.randint(0, 4)))
+        recipe.ingredients.set(rng.sample(ingredients, rng.randint(0, 4)))
+
+
+def render_instances(queryset, fields=None):
+    recipes = queryset.prefetch_related(*nested_prefetches(NESTED_FIELDS))
+    serializer = RecipeSerializer(
+        recipes, many=True, context={'fields': fields})
+    return JSONRenderer().render(serializer.data)
+
+
+def render_rows(queryset, fields=None):
+    names = [
+        name for name in RecipeSerializer.Meta.fields
+        if fields is None or name in fields
+    ]
+    rows = queryset.values(*RecipeRowListSerializer.get_columns(names))
+    serializer = RecipeRowListSerializer(rows, context={'fields': fields})
+    return JSONRenderer().render(serializer.data)
+
+
+class RecipeRowListSerializerTests(TestCase):
+    """Test values() rows render byte for byte like model instances."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        create_recipes(self.user, 60)
+        self.queryset = Recipe.objects.order_by('-id')
+
+    def test_full_parity(self):
+        self.assertEqual(render_rows(self.queryset),
+                         render_instances(self.queryset))
+
+    def test_sparse_parity(self):
+        for fields in ({'id'}, {'price', 'title'}, {'tags'},
+                       {'id', 'link', 'ingredients'}):
+            with self.subTest(fields=fields):
+                self.assertEqual(render_rows(self.queryset, fields),
+                                 render_instances(self.queryset, fields))
+
+    def test_empty(self):
+        queryset = Recipe.objects.none()
+
+        self.assertEqual(render_rows(queryset), b'[]')
+
+    def test_api_list_parity(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        for params, ordering, fields in (
+            ({}, ('-id',), None),
+            ({'ordering': 'price'}, RECIPE_ORDERINGS['price'], None),
+            ({'fields': 'title,price', 'expand': 'tags'}, ('-id',),
+             {'title', 'price', 'tags'}),
+        ):
+            with self.subTest(params=params):
+                res = client.get(RECIPES_URL, params)
+
+                queryset = Recipe.objects.order_by(*ordering)
+                self.assertEqual(res.content,
+                                 render_instances(queryset, fields))
+
+    def test_benchmark_command(self):
+        out, err = StringIO(), StringIO()
+
+        call_command('benchmark_recipe_list', '--recipes', '20',
+                     '--repeat', '1', stdout=out, stderr=err)
+
+        self.assertIn('speedup:', out.getvalue())
+        self.assertEqual(err.getvalue(), '')
+        self.assertFalse(
+            Recipe.objects.filter(user__username='benchmark_recipe_list'))
@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
@@ -83,6 +83,17 @@ class PrivateTagsApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(tag.name, payload['name'])
 
+    def test_update_tag_duplicate_name(self):
+        Tag.objects.create(user=self.user, name='Meat')
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        payload = {'name': 'Meat'}
+
+        res = self.client.patch(detail_url(tag.id), payload)
+        tag.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(tag.name, 'Vegan')
+
     def test_delete_tag(self):
         tag = Tag.objects.create(user=self.user, name='Vegan')
 
@@ -132,3 +143,54 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
         self.assertEqual(len(res.data), 1)
+
+    def test_autocomplete_prefix_matches_first(self):
+        for name in ['Sweet', 'Dessert', 'Desserts', 'Dinner']:
+            Tag.objects.create(user=self.user, name=name)
+
+        res = self.client.get(TAGS_URL, {'q': 'des'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['name'] for t in res.data][:2],
+                         ['Dessert', 'Desserts'])
+        self.assertNotIn('Dinner', [t['name'] for t in res.data])
+
+    @override_settings(AUTOCOMPLETE_LIMIT=2)
+    def test_autocomplete_limited(self):
+        for i in range(5):
+            Tag.objects.create(user=self.user, name=f'Vegan {i}')
+
+        res = self.client.get(TAGS_URL, {'q': 'vegan', 'page_size': 10})
+
+        self.assertEqual([t['name'] for t in res.data],
+                         ['Vegan 0', 'Vegan 1'])
+
+    def test_autocomplete_limited_to_user(self):
+        Tag.objects.create(user=create_user('other', 'other@example.com'),
+                           name='Vegan')
+        Tag.objects.create(user=self.user, name='Dinner')
+
+        res = self.client.get(TAGS_URL, {'q': 'vegan'})
+
+        self.assertEqual(res.data, [])
+
+    def test_autocomplete_fuzzy(self):
+        """Test names within trigram similarity match despite typos."""
+        Tag.objects.create(user=self.user, name='Vegetarian')
+        Tag.objects.create(user=self.user, name='Dinner')
+
+        res = self.client.get(TAGS_URL, {'q': 'vegitarian'})
+
+        self.assertEqual([t['name'] for t in res.data], ['Vegetarian'])
+
+    @override_settings(AUTOCOMPLETE_MIN_SIMILARITY=0.9)
+    def test_autocomplete_min_similarity(self):
+        Tag.objects.create(user=self.user, name='Vegetarian')
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.get(TAGS_URL, {'q': 'vegitarian'})
+        self.assertEqual(res.data, [])
+
+        res = self.client.get(TAGS_URL, {'q': 've'})
+        self.assertEqual([t['name'] for t in res.data],
+                         ['Vegan', 'Vegetarian'])
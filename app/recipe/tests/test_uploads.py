@@ -0,0 +1,178 @@
+"""
+Test streaming, size-limited image uploads
+"""
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import exceptions, status
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+
+from recipe.uploads import ImageTooLarge, ImageUploadHandler
+
+
+def image_upload_url(recipe_id):
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+def image_bytes(size=(10, 10), image_format='PNG'):
+    buffer = BytesIO()
+    Image.new('RGB', size).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def new_handler(field_name='image'):
+    handler = ImageUploadHandler(RequestFactory().post('/'))
+    handler.new_file(field_name, 'image.png', 'image/png', None)
+    return handler
+
+
+class ImageUploadHandlerTests(TestCase):
+    def test_valid_image(self):
+        data = image_bytes()
+        handler = new_handler()
+
+        handler.receive_data_chunk(data, 0)
+        file = handler.file_complete(len(data))
+
+        self.assertEqual(file.image_format, 'PNG')
+        self.assertEqual(file.image_size, (10, 10))
+        self.assertEqual(len(file.sha256), 64)
+        self.assertEqual(file.read(), data)
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=50)
+    def test_too_many_pixels_rejected_from_header(self):
+        """Test the header alone is enough to reject a large image"""
+        handler = new_handler()
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            handler.receive_data_chunk(image_bytes()[:64], 0)
+
+        self.assertIn('image', cm.exception.detail)
+
+    @override_settings(IMAGE_UPLOAD_MAX_BYTES=100)
+    def test_too_many_bytes_rejected_while_streaming(self):
+        handler = new_handler()
+        handler.receive_data_chunk(image_bytes()[:64], 0)
+
+        with self.assertRaises(ImageTooLarge):
+            handler.receive_data_chunk(b'\0' * 64, 64)
+
+    @override_settings(IMAGE_UPLOAD_MAX_BYTES=100)
+    def test_content_length_rejected_before_reading(self):
+        handler = ImageUploadHandler(RequestFactory().post('/'))
+
+        with self.assertRaises(ImageTooLarge):
+            handler.handle_raw_input(None, {}, 10 * 1024 * 1024, b'')
+
+    def test_truncated_image_rejected(self):
+        handler = new_handler()
+        handler.receive_data_chunk(b'\x89PNG', 0)
+
+        with self.assertRaises(exceptions.ValidationError):
+            handler.file_complete(4)
+
+
+class ImageUploadApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='12345678',
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Test recipe',
+            time_minutes=10,
+            price=Decimal('5.50'),
+        )
+
+    def tearDown(self):
+        self.recipe.refresh_from_db()
+        self.recipe.image.delete()
+
+    def upload(self, data, name='image.png'):
+        payload = {'image': SimpleUploadedFile(name, data)}
+        with patch('recipe.views.schedule_image_processing') as schedule:
+            res = self.client.post(image_upload_url(self.recipe.id),
+                                   payload, format='multipart')
+        self.recipe.refresh_from_db()
+        return res, schedule
+
+    @override_settings(IMAGE_UPLOAD_MAX_BYTES=100)
+    def test_upload_too_large(self):
+        res, _ = self.upload(image_bytes((100, 100)))
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(self.recipe.image)
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=50)
+    def test_upload_too_many_pixels(self):
+        res, _ = self.upload(image_bytes())
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', res.data)
+        self.assertFalse(self.recipe.image)
+
+    def test_upload_unsupported_format(self):
+        res, _ = self.upload(image_bytes(image_format='GIF'), 'image.gif')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_not_an_image(self):
+        res, _ = self.upload(b'not an image', 'image.png')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_stores_hash(self):
+        res, schedule = self.upload(image_bytes())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(self.recipe.image_sha256), 64)
+        schedule.assert_called_once()
+
+    def test_repeated_upload_not_stored_again(self):
+        data = image_bytes()
+        self.upload(data)
+        name = self.recipe.image.name
+
+        res, schedule = self.upload(data)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.recipe.image.name, name)
+        schedule.assert_not_called()
+
+    def test_detail_update_ignores_image(self):
+        url = reverse('recipe:recipe-detail', args=[self.recipe.id])
+        payload = {'title': 'New title',
+                   'image': SimpleUploadedFile('image.png', image_bytes())}
+
+        res = self.client.patch(url, payload, format='multipart')
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.recipe.title, 'New title')
+        self.assertFalse(self.recipe.image)
+
+    @override_settings(IMAGE_UPLOAD_MAX_BYTES=100)
+    def test_detail_update_cannot_bypass_limits(self):
+        url = reverse('recipe:recipe-detail', args=[self.recipe.id])
+        payload = {'image': SimpleUploadedFile(
+            'image.gif', image_bytes((100, 100), image_format='GIF'))}
+
+        self.client.patch(url, payload, format='multipart')
+
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.image)
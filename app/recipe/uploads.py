@@ -0,0 +1,110 @@
+"""
+Streaming, size-limited image uploads for the Recipe APIs
+"""
+import hashlib
+import io
+
+from PIL import Image
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.utils.translation import gettext as _, gettext_lazy
+
+from rest_framework import exceptions, status
+
+# Bytes of an upload inspected for the image header before giving up
+HEADER_BYTES = 256 * 1024
+# Allowance for multipart boundaries and headers in Content-Length
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class ImageTooLarge(exceptions.APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = gettext_lazy('Image file is too large.')
+    default_code = 'image_too_large'
+
+
+def invalid_image(msg):
+    return exceptions.ValidationError(msg, code='invalid_image')
+
+
+def read_image_header(data):
+    """
+    Return (format, (width, height)) from the start of an image file
+    without decoding its pixels, or None if `data` is too short to tell.
+
+    Raises a ValidationError for data that is not an image, unsupported
+    formats and images over IMAGE_UPLOAD_MAX_PIXELS.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image_format, size = image.format, image.size
+    except Image.DecompressionBombError:
+        raise invalid_image(_('Image has too many pixels.'))
+    except OSError:
+        if len(data) < HEADER_BYTES:
+            return None
+        raise invalid_image(_('Upload a valid image.'))
+
+    if image_format not in settings.IMAGE_UPLOAD_FORMATS:
+        raise invalid_image(_('Unsupported image format.'))
+    if size[0] * size[1] > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        raise invalid_image(_('Image has too many pixels.'))
+
+    return image_format, size
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream uploads to a temporary file while hashing them, and reject
+    files that are too large or not a supported image as soon as the
+    header or size gives them away.
+
+    Completed files carry `sha256`, `image_format` and `image_size`.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        max_bytes = settings.IMAGE_UPLOAD_MAX_BYTES
+        if content_length > max_bytes + MULTIPART_OVERHEAD:
+            raise ImageTooLarge()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.received = 0
+        self.header = bytearray()
+        self.image_info = None
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        try:
+            if self.received > settings.IMAGE_UPLOAD_MAX_BYTES:
+                raise ImageTooLarge()
+            if self.image_info is None:
+                self.header += raw_data
+                self.image_info = read_image_header(bytes(self.header))
+        except exceptions.ValidationError as exc:
+            self.upload_interrupted()
+            raise exceptions.ValidationError({self.field_name: exc.detail})
+        except exceptions.APIException:
+            self.upload_interrupted()
+            raise
+
+        if self.image_info is not None:
+            self.header = None
+        self.sha256.update(raw_data)
+
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if self.image_info is None:
+            self.upload_interrupted()
+            raise exceptions.ValidationError(
+                {self.field_name: [_('Upload a valid image.')]})
+
+        file = super().file_complete(file_size)
+        file.sha256 = self.sha256.hexdigest()
+        file.image_format, file.image_size = self.image_info
+
+        return file
@@ -1,48 +1,322 @@
 """
 View for the Recipe APIs
 """
+from collections import Counter
+from decimal import Decimal
+
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
     OpenApiParameter,
     OpenApiTypes,
 )
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    BooleanField,
+    CharField,
+    Count,
+    Exists,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    OuterRef,
+    Prefetch,
+    Q,
+    Value,
+)
+from django.db.models.functions import Cast
+from django.utils.translation import gettext as _
+
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
 
-from core.models import Recipe, Tag, Ingredient
+from core.authentication import CachedTokenAuthentication
+from core.models import SEARCH_CONFIG, Recipe, Tag, Ingredient
 from recipe import serializers
+from recipe.cache import (
+    CachedListMixin,
+    CachedRetrieveMixin,
+    cached_response,
+)
+from recipe.conditional import (
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    conditional_response,
+    get_user_version,
+)
+from recipe.images import schedule_image_processing
+from recipe.pagination import RecipeCursorPagination, NameCursorPagination
+from recipe.uploads import ImageUploadHandler
+
+
+RECIPE_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        'tags',
+        OpenApiTypes.STR,
+        description='Comma separated list of tag IDs to filter',
+    ),
+    OpenApiParameter(
+        'ingredients',
+        OpenApiTypes.STR,
+        description='Comma separated list of ingredient IDs to filter',
+    ),
+    OpenApiParameter(
+        'match',
+        OpenApiTypes.STR, enum=['any', 'all'],
+        description='Match recipes having any (default) or all of the '
+                    'requested tags and ingredients.',
+    ),
+    OpenApiParameter(
+        'search',
+        OpenApiTypes.STR,
+        description='Full-text search of titles and descriptions. Results '
+                    'are ordered by relevance unless `ordering` is given.',
+    ),
+    OpenApiParameter(
+        'price_min',
+        OpenApiTypes.DECIMAL,
+        description='Only recipes costing at least this much.',
+    ),
+    OpenApiParameter(
+        'price_max',
+        OpenApiTypes.DECIMAL,
+        description='Only recipes costing at most this much.',
+    ),
+    OpenApiParameter(
+        'time_max',
+        OpenApiTypes.INT,
+        description='Only recipes taking at most this many minutes.',
+    ),
+]
+
+# Sort keys accepted by `ordering`, each ending in id to be unique
+RECIPE_ORDERINGS = {
+    'id': ('id',),
+    '-id': ('-id',),
+    'price': ('price', 'id'),
+    '-price': ('-price', '-id'),
+    'time_minutes': ('time_minutes', 'id'),
+    '-time_minutes': ('-time_minutes', '-id'),
+}
+
 
+def parse_price(value):
+    price = Decimal(value)
+    if not price.is_finite():
+        raise ValueError(value)
 
-class RecipeViewSet(viewsets.ModelViewSet):
+    return price
+
+
+RECIPE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        'fields',
+        OpenApiTypes.STR,
+        description='Comma separated list of the fields to return. All '
+                    'fields are returned by default.',
+    ),
+    OpenApiParameter(
+        'expand',
+        OpenApiTypes.STR,
+        description='Comma separated list of nested fields (tags, '
+                    'ingredients) to return in addition to `fields`.',
+    ),
+]
+
+# Recipe fields serialized from related tables
+NESTED_FIELDS = ('tags', 'ingredients')
+
+
+def nested_prefetches(names):
+    """
+    Prefetch the nested fields `names` in id order, the order their
+    tag_ids and ingredient_ids arrays keep
+    """
+    return [
+        Prefetch(name, queryset=Recipe._meta.get_field(
+            name).related_model.objects.order_by('id'))
+        for name in names
+    ]
+
+
+@extend_schema_view(
+    list=extend_schema(
+        parameters=RECIPE_FILTER_PARAMETERS + RECIPE_FIELDS_PARAMETERS + [
+            OpenApiParameter(
+                'ordering',
+                OpenApiTypes.STR, enum=list(RECIPE_ORDERINGS),
+                description='Sort order, newest first (-id) by default.',
+            ),
+        ]
+    ),
+    retrieve=extend_schema(parameters=RECIPE_FIELDS_PARAMETERS),
+)
+class RecipeViewSet(ConditionalListMixin,
+                    ConditionalRetrieveMixin,
+                    CachedListMixin,
+                    CachedRetrieveMixin,
+                    viewsets.ModelViewSet):
     """View for manage recipe APIs"""
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = RecipeCursorPagination
 
     def _params_to_ints(self, qs):
         """Converts a list of string to integers"""
         return [int(str_id) for str_id in qs.split(',')]
 
+    def _filter_related(self, queryset, field, ids, match_all):
+        """
+        Filter recipes on their `field` id array, which the GIN index
+        serves in one predicate however many ids are given
+        """
+        lookup = 'contains' if match_all else 'overlap'
+        return queryset.filter(**{f'{field}__{lookup}': sorted(ids)})
+
+    def _search(self, queryset, text):
+        """Filter recipes matching `text`, most relevant first"""
+        query = SearchQuery(text, config=SEARCH_CONFIG,
+                            search_type='websearch')
+        # ts_rank returns a real, which loses precision on its way into
+        # a cursor; a double survives the round trip
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=Cast(SearchRank(F('search_vector'), query),
+                             FloatField()),
+        ).order_by('-search_rank', '-id')
+
+    def _get_number(self, name, parse):
+        """Return the query parameter `name` parsed by `parse`, if given"""
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+
+        try:
+            return parse(value)
+        except (ArithmeticError, ValueError):
+            msg = _('A valid number is required.')
+            raise ValidationError({name: [msg]})
+
+    def _filter_ranges(self, queryset):
+        """Apply the price and time range filters"""
+        for name, lookup, parse in (
+            ('price_min', 'price__gte', parse_price),
+            ('price_max', 'price__lte', parse_price),
+            ('time_max', 'time_minutes__lte', int),
+        ):
+            value = self._get_number(name, parse)
+            if value is not None:
+                queryset = queryset.filter(**{lookup: value})
+
+        return queryset
+
+    def _get_requested_fields(self):
+        """
+        Return the names asked for with `fields` and `expand` when reading
+        recipes, or None for every field
+        """
+        params = self.request.query_params
+        if self.action not in ('list', 'retrieve') or 'fields' not in params:
+            return None
+
+        requested = set()
+        for param, allowed in (
+            ('fields', self.get_serializer_class().Meta.fields),
+            ('expand', NESTED_FIELDS),
+        ):
+            names = {name for name in params.get(param, '').split(',') if name}
+            unknown = names.difference(allowed)
+            if unknown:
+                msg = _('Unknown fields: {names}.').format(
+                    names=', '.join(sorted(unknown)))
+                raise ValidationError({param: [msg]})
+            requested |= names
+
+        return requested
+
+    def _select_fields(self, queryset, requested):
+        """
+        Load only the columns behind the requested fields and the
+        ordering, and prefetch only the requested nested fields. Lists
+        read plain values() rows for RecipeRowListSerializer.
+        """
+        ordering = {name.lstrip('-') for name in queryset.query.order_by}
+        if self.action == 'list':
+            names = self.get_serializer_class().Meta.fields
+            if requested is not None:
+                names = [name for name in names if name in requested]
+            return queryset.values(
+                *serializers.RecipeRowListSerializer.get_columns(names) |
+                ordering)
+
+        if requested is None:
+            return queryset.prefetch_related(*nested_prefetches(NESTED_FIELDS))
+
+        columns = {field.name for field in Recipe._meta.concrete_fields}
+        return queryset.only(
+            'id', *(requested | ordering) & columns,
+        ).prefetch_related(*nested_prefetches(
+            name for name in NESTED_FIELDS if name in requested))
+
     def get_queryset(self):
         """Return objects for the current authenticated user only"""
         tags = self.request.query_params.get('tags')
         ingredients = self.request.query_params.get('ingredients')
-        queryset = self.queryset
+        match = self.request.query_params.get('match', 'any')
+        if match not in ('any', 'all'):
+            msg = _('Must be one of "any" or "all".')
+            raise ValidationError({'match': [msg]})
+
+        ordering = self.request.query_params.get('ordering')
+        if ordering is not None and ordering not in RECIPE_ORDERINGS:
+            msg = _('Must be one of {orderings}.').format(
+                orderings=', '.join(RECIPE_ORDERINGS))
+            raise ValidationError({'ordering': [msg]})
+
+        match_all = match == 'all'
+        queryset = self._filter_ranges(self.queryset.order_by('-id'))
         if tags:
-            tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            tag_ids = set(self._params_to_ints(tags))
+            queryset = self._filter_related(
+                queryset, 'tag_ids', tag_ids, match_all)
         if ingredients:
-            ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+            ingredient_ids = set(self._params_to_ints(ingredients))
+            queryset = self._filter_related(
+                queryset, 'ingredient_ids', ingredient_ids, match_all)
+        search = self.request.query_params.get('search', '').strip()
+        if search:
+            queryset = self._search(queryset, search)
+        if ordering is not None:
+            queryset = queryset.order_by(*RECIPE_ORDERINGS[ordering])
 
-        return queryset.filter(
-            user=self.request.user
-        ).order_by('-id').distinct()
+        return self._select_fields(
+            queryset.filter(user=self.request.user),
+            self._get_requested_fields(),
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self._get_requested_fields()
+
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        """Render recipe lists straight from their values() rows"""
+        if self.action == 'list' and kwargs.pop('many', False):
+            kwargs.setdefault('context', self.get_serializer_context())
+            return serializers.RecipeRowListSerializer(*args, **kwargs)
+
+        return super().get_serializer(*args, **kwargs)
 
     def get_serializer_class(self):
         """Return appropriate serializer class"""
@@ -57,16 +331,176 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """Create a new recipe"""
         serializer.save(user=self.request.user)
 
+    def _bulk_response(self, recipes, status_code):
+        """Serialize saved recipes in request order with their relations"""
+        order = {recipe.pk: i for i, recipe in enumerate(recipes)}
+        saved = sorted(
+            Recipe.objects.filter(pk__in=order).prefetch_related(
+                *nested_prefetches(NESTED_FIELDS)),
+            key=lambda recipe: order[recipe.pk],
+        )
+        serializer = self.get_serializer(saved, many=True)
+
+        return Response(serializer.data, status=status_code)
+
+    def _bulk_create(self, items):
+        serializer = self.get_serializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+        recipes = serializer.save(user=self.request.user)
+
+        return self._bulk_response(recipes, status.HTTP_201_CREATED)
+
+    def _bulk_update(self, items):
+        ids = [
+            item.get('id') if isinstance(item, dict) else None
+            for item in items
+        ]
+        # Repeated items would be applied in turn, merging their relations
+        seen = set()
+        errors = [{} for _item in items]
+        for error, i in zip(errors, ids):
+            if type(i) is int and i in seen:
+                error['id'] = [_('Recipe repeated in the request.')]
+            seen.add(i)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        found = Recipe.objects.filter(user=self.request.user).in_bulk(
+            [i for i in ids if type(i) is int])
+        instances = [found.get(i) if type(i) is int else None for i in ids]
+        serializer = self.get_serializer(
+            instances, data=items, many=True, partial=True)
+
+        errors = [{} for _item in items]
+        if not serializer.is_valid():
+            errors = [dict(error) for error in serializer.errors]
+        for error, instance in zip(errors, instances):
+            if instance is None:
+                error['id'] = [_('Recipe not found.')]
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        recipes = serializer.save()
+        return self._bulk_response(recipes, status.HTTP_200_OK)
+
+    def _bulk_delete(self, ids):
+        if (not isinstance(ids, list) or
+                not all(type(i) is int for i in ids)):
+            msg = _('Expected a list of recipe ids.')
+            raise ValidationError({'ids': [msg]})
+        repeated = sorted(i for i, n in Counter(ids).items() if n > 1)
+        if repeated:
+            msg = _('Recipes repeated: {ids}.').format(ids=repeated)
+            raise ValidationError({'ids': [msg]})
+
+        with transaction.atomic():
+            # Not get_queryset(), whose list filters come from the query
+            recipes = Recipe.objects.filter(user=self.request.user,
+                                            id__in=ids)
+            found = set(recipes.values_list('id', flat=True))
+            missing = [i for i in ids if i not in found]
+            if missing:
+                msg = _('Recipes not found: {ids}.').format(ids=missing)
+                raise ValidationError({'ids': [msg]})
+            recipes.delete()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(
+        request=serializers.RecipeDetailSerializer(many=True),
+        responses=serializers.RecipeDetailSerializer(many=True),
+    )
+    @action(methods=['POST', 'PATCH', 'DELETE'], detail=False,
+            url_path='bulk')
+    def bulk(self, request):
+        """
+        Create (POST) or partially update (PATCH) a list of recipes, or
+        delete (DELETE) the recipes in `ids`, all in one transaction.
+        Invalid items fail the whole request with per-item errors.
+        """
+        if request.method == 'DELETE':
+            data = request.data
+            return self._bulk_delete(
+                data.get('ids') if isinstance(data, dict) else None)
+
+        items = request.data
+        if not isinstance(items, list):
+            msg = _('Expected a list of items.')
+            raise ValidationError({'non_field_errors': [msg]})
+        if len(items) > settings.API_BULK_MAX_ITEMS:
+            msg = _('At most {count} items are allowed.').format(
+                count=settings.API_BULK_MAX_ITEMS)
+            raise ValidationError({'non_field_errors': [msg]})
+
+        if request.method == 'POST':
+            return self._bulk_create(items)
+        return self._bulk_update(items)
+
+    def _get_facets(self, queryset):
+        """
+        Return the number of recipes in `queryset` linked to each tag and
+        ingredient, counted in one grouped query over the through tables
+        """
+        recipe_ids = queryset.order_by().prefetch_related(None).values('id')
+        counts = [
+            through.objects.filter(recipe_id__in=recipe_ids).values(
+                f'{field}_id'
+            ).annotate(
+                facet=Value(facet, output_field=CharField()),
+                name=F(f'{field}__name'),
+                count=Count('*'),
+            ).values_list('facet', f'{field}_id', 'name', 'count')
+            for facet, through, field in (
+                ('tags', Recipe.tags.through, 'tag'),
+                ('ingredients', Recipe.ingredients.through, 'ingredient'),
+            )
+        ]
+
+        facets = {'tags': [], 'ingredients': []}
+        rows = counts[0].union(counts[1], all=True)
+        for facet, id, name, count in sorted(
+                rows, key=lambda row: (-row[3], row[2], row[1])):
+            facets[facet].append({'id': id, 'name': name, 'count': count})
+
+        return facets
+
+    @extend_schema(
+        parameters=RECIPE_FILTER_PARAMETERS,
+        responses=serializers.RecipeFacetsSerializer,
+    )
+    @action(methods=['GET'], detail=False)
+    def facets(self, request):
+        """
+        Count the recipes matching the list filters per tag and
+        ingredient, most used first
+        """
+        version, last_modified = get_user_version(request.user)
+
+        return conditional_response(
+            request, version, last_modified,
+            lambda: cached_response(
+                request, self,
+                lambda: Response(self._get_facets(self.get_queryset())),
+            ),
+        )
+
     @action(methods=['POST'], detail=True, url_path='upload-image')
     def upload_image(self, request, pk=None):
+        # Must be set before request.data is first read
+        request._request.upload_handlers = [
+            ImageUploadHandler(request._request)]
         recipe = self.get_object()
         serializer = self.get_serializer(recipe, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            sha256 = serializer.validated_data['image_sha256']
+            # Retried uploads of the current image are not stored again
+            if not recipe.image or sha256 != recipe.image_sha256:
+                recipe = serializer.save()
+                schedule_image_processing(recipe)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
-        return Response(serializer.data, status=status.HTTP_400_BAD_REQUEST)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 @extend_schema_view(
@@ -76,16 +510,29 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 'assigned_only',
                 OpenApiTypes.INT, enum=[0, 1],
                 description='Filter by items assigned to recipes.',
-            )
+            ),
+            OpenApiParameter(
+                'q',
+                OpenApiTypes.STR,
+                description='Autocomplete: return the best few names '
+                            'starting with or similar to this text, '
+                            'unpaginated.',
+            ),
         ]
     )
 )
-class BaseRecipeViewSet(mixins.UpdateModelMixin,
+class BaseRecipeViewSet(ConditionalListMixin,
+                        CachedListMixin,
+                        mixins.UpdateModelMixin,
                         mixins.DestroyModelMixin,
                         mixins.ListModelMixin,
                         viewsets.GenericViewSet):
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = NameCursorPagination
+    # m2m through table and its column linking recipes to this model
+    recipe_through = None
+    recipe_through_field = None
 
     def get_queryset(self):
         """Return objects for the current authenticated user only"""
@@ -94,20 +541,63 @@ class BaseRecipeViewSet(mixins.UpdateModelMixin,
         )
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            queryset = queryset.filter(Exists(
+                self.recipe_through.objects.filter(
+                    **{self.recipe_through_field: OuterRef('pk')})
+            ))
+
+        queryset = queryset.filter(user=self.request.user)
+        text = self.request.query_params.get('q', '').strip()
+        if text and self.action == 'list':
+            return self._autocomplete(queryset, text)
+
+        return queryset.order_by('-name', '-id')
+
+    def _autocomplete(self, queryset, text):
+        """
+        Return the AUTOCOMPLETE_LIMIT names most like `text`, prefix
+        matches first. Other matches need a trigram similarity of at
+        least AUTOCOMPLETE_MIN_SIMILARITY.
+        """
+        prefix = Q(name__istartswith=text)
+        return queryset.annotate(
+            similarity=TrigramSimilarity('name', text),
+        ).filter(
+            prefix | Q(similarity__gte=settings.AUTOCOMPLETE_MIN_SIMILARITY)
+        ).annotate(
+            is_prefix=ExpressionWrapper(prefix, output_field=BooleanField()),
+        ).order_by(
+            '-is_prefix', '-similarity', 'name',
+        )[:settings.AUTOCOMPLETE_LIMIT]
+
+    def paginate_queryset(self, queryset):
+        """Leave autocomplete results, which are already limited, whole"""
+        if queryset.query.is_sliced:
+            return None
+
+        return super().paginate_queryset(queryset)
 
-        return queryset.filter(
-            user=self.request.user
-        ).order_by('-name').distinct()
+    def perform_update(self, serializer):
+        """Reject renames that clash with another of the user's names"""
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            msg = _('An item with this name already exists.')
+            raise ValidationError({'name': [msg]}, code='unique')
 
 
 class TagViewSet(BaseRecipeViewSet):
     """View for manage tag APIs"""
     serializer_class = serializers.TagSerializer
     queryset = Tag.objects.all()
+    recipe_through = Recipe.tags.through
+    recipe_through_field = 'tag_id'
 
 
 class IngredientViewSet(BaseRecipeViewSet):
     """View for manage tag APIs"""
     serializer_class = serializers.IngredientSerializer
     queryset = Ingredient.objects.all()
+    recipe_through = Recipe.ingredients.through
+    recipe_through_field = 'ingredient_id'
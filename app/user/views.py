@@ -1,7 +1,10 @@
-from rest_framework import generics, authentication, permissions
+from django.contrib.auth import get_user_model
+
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
+from core.authentication import CachedTokenAuthentication
 from user.serializers import UserSerializer, AuthTokenSerializer
 
 
@@ -19,9 +22,10 @@ class CreateTokenView(ObtainAuthToken):
 class UpdateUserView(generics.RetrieveUpdateAPIView):
     """Update an existing user"""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """Retrieve and return authenticated user"""
-        return self.request.user
+        # CachedTokenAuthentication only loads the user's id and is_active
+        return get_user_model().objects.get(pk=self.request.user.pk)